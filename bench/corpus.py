@@ -0,0 +1,97 @@
+import argparse
+import os
+import random
+
+FEATURES = ("headings", "lists", "code", "links", "images", "emphasis")
+
+WORDS = (
+    "hobbit ring shire elf wizard mountain river forest road tower king "
+    "sword song night star journey friend shadow light stone gate"
+).split()
+
+
+def parse_mix(text):
+    mix = {feature: 1.0 for feature in FEATURES}
+    if not text:
+        return mix
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in mix:
+            raise ValueError(f"Unknown corpus feature: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def _words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def _inline(rng, mix):
+    parts = []
+    for _ in range(rng.randint(3, 8)):
+        roll = rng.random() * (3 + mix["emphasis"] + mix["links"] + mix["images"])
+        if roll < 3:
+            parts.append(_words(rng, rng.randint(2, 8)))
+        elif roll < 3 + mix["emphasis"]:
+            style = rng.choice(("**{}**", "_{}_", "`{}`"))
+            parts.append(style.format(_words(rng, rng.randint(1, 3))))
+        elif roll < 3 + mix["emphasis"] + mix["links"]:
+            parts.append(f"[{_words(rng, 2)}](/{rng.choice(WORDS)}/{rng.randint(0, 99)})")
+        else:
+            parts.append(f"![{_words(rng, 2)}](/images/{rng.choice(WORDS)}.png)")
+    return " ".join(parts)
+
+
+def generate_markdown(rng, blocks, mix):
+    kinds = ["paragraph", "quote"] + [f for f in ("headings", "lists", "code") if mix[f] > 0]
+    weights = [3, 0.5] + [mix[f] for f in ("headings", "lists", "code") if mix[f] > 0]
+    out = [f"# {_words(rng, 3).title()}"]
+    for _ in range(blocks):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "paragraph":
+            lines = [_inline(rng, mix) for _ in range(rng.randint(1, 4))]
+            out.append("\n".join(lines))
+        elif kind == "quote":
+            out.append("\n".join(f"> {_inline(rng, mix)}" for _ in range(rng.randint(1, 3))))
+        elif kind == "headings":
+            out.append(f"{'#' * rng.randint(2, 6)} {_words(rng, rng.randint(2, 5))}")
+        elif kind == "lists":
+            count = rng.randint(2, 6)
+            if rng.random() < 0.5:
+                out.append("\n".join(f"- {_inline(rng, mix)}" for _ in range(count)))
+            else:
+                out.append("\n".join(f"{i}. {_inline(rng, mix)}" for i in range(1, count + 1)))
+        else:
+            lines = [f"    {_words(rng, rng.randint(2, 6))}" for _ in range(rng.randint(2, 8))]
+            out.append("```\n" + "\n".join(lines) + "\n```")
+    return "\n\n".join(out) + "\n"
+
+
+def generate_corpus(root, pages, blocks=40, seed=0, mix=None):
+    mix = mix if mix is not None else parse_mix(None)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(pages):
+        directory = os.path.join(root, f"section{i % 10}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"page{i}.md")
+        with open(path, "w") as file:
+            file.write(generate_markdown(rng, blocks, mix))
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m bench.corpus")
+    parser.add_argument("root")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix", help="feature weights, e.g. links=2,code=0")
+    args = parser.parse_args(argv)
+    paths = generate_corpus(args.root, args.pages, args.blocks, args.seed, parse_mix(args.mix))
+    print(f"Wrote {len(paths)} pages to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import tracemalloc
+
+from src.htmlnode import LeafNode, ParentNode
+from src.markdown_html import markdown_to_html_node
+from src.textnode import TextNode, TextType
+
+
+def sample_markdown(paragraphs):
+    blocks = []
+    for i in range(paragraphs):
+        blocks.append(f"## Section {i}")
+        blocks.append(
+            f"Some **bold** and _italic_ text with `code` and a [link](/page/{i})."
+        )
+        blocks.append(f"- item {i}\n- item with ![image](/images/{i}.png)")
+    return "\n\n".join(blocks)
+
+
+def count_nodes(node):
+    count = 1
+    for child in node.children or ():
+        count += count_nodes(child)
+    return count
+
+
+def measure(factory, count):
+    url = "https://example.com"
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    nodes = [factory(url) for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del nodes
+    return total / count
+
+
+def measure_tree(markdown):
+    tracemalloc.start()
+    tree = markdown_to_html_node(markdown)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count_nodes(tree), current, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m bench.node_memory")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--paragraphs", type=int, default=2_000)
+    args = parser.parse_args(argv)
+
+    factories = {
+        "TextNode": lambda url: TextNode("text", TextType.LINK, url),
+        "LeafNode (text)": lambda url: LeafNode(None, "text"),
+        "LeafNode (link)": lambda url: LeafNode("a", "text", {"href": url}),
+        "ParentNode": lambda url: ParentNode("p", [None]),
+    }
+    for name, factory in factories.items():
+        print(f"{name:<18} {measure(factory, args.count):8.1f} bytes/node")
+
+    nodes, current, peak = measure_tree(sample_markdown(args.paragraphs))
+    print(
+        f"{'page tree':<18} {current / nodes:8.1f} bytes/node "
+        f"({nodes} nodes, peak {peak / 1024:.0f} KiB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from bench.corpus import generate_corpus, parse_mix
+from src.inline_markdown import text_to_textnode
+from src.main import generate_site
+from src.manifest import Manifest
+from src.markdown_blocks import BlockType, block_to_block_type, markdown_to_blocks
+from src.markdown_html import iter_markdown_html, markdown_to_html_node
+
+TEMPLATE = '<html><head><title>{{ Title }}</title><link href="/index.css" /></head><body>{{ Content }}</body></html>'
+
+
+def best_of(repeat, func):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def inline_texts(blocks):
+    texts = []
+    for block in blocks:
+        block_type = block_to_block_type(block)
+        if block_type == BlockType.PARAGRAPH:
+            texts.append(" ".join(block.split("\n")))
+        elif block_type in (BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST):
+            texts.extend(line.split(" ", 1)[1] for line in block.split("\n"))
+    return texts
+
+
+def run_stages(root, args):
+    content = os.path.join(root, "content")
+    paths = generate_corpus(
+        content, args.pages, args.blocks, args.seed, parse_mix(args.mix)
+    )
+    documents = []
+    for path in paths:
+        with open(path) as file:
+            documents.append(file.read())
+    blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    texts = inline_texts(blocks)
+    trees = [markdown_to_html_node(document) for document in documents]
+    template = os.path.join(root, "template.html")
+    with open(template, "w") as file:
+        file.write(TEMPLATE)
+
+    def full_build():
+        dest = tempfile.mkdtemp(dir=root)
+        manifest = Manifest(os.path.join(dest, "manifest.json"))
+        with redirect_stdout(StringIO()):
+            generate_site(content, template, dest, "/", manifest, args.jobs)
+
+    stages = {
+        "markdown_to_blocks": lambda: [markdown_to_blocks(d) for d in documents],
+        "block_to_block_type": lambda: [block_to_block_type(b) for b in blocks],
+        "text_to_textnode": lambda: [text_to_textnode(t) for t in texts],
+        "markdown_to_html_node": lambda: [markdown_to_html_node(d) for d in documents],
+        "to_html": lambda: [tree.to_html() for tree in trees],
+        "iter_markdown_html": lambda: [
+            "".join(iter_markdown_html(StringIO(d))) for d in documents
+        ],
+        "generate_site": full_build,
+    }
+    counts = {
+        "pages": len(documents),
+        "bytes": sum(len(d) for d in documents),
+        "blocks": len(blocks),
+        "inline_texts": len(texts),
+    }
+    return {name: best_of(args.repeat, func) for name, func in stages.items()}, counts
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, seconds in results["stages"].items():
+        previous = baseline.get("stages", {}).get(name)
+        if not previous:
+            continue
+        change = seconds / previous - 1
+        marker = ""
+        if change > threshold:
+            marker = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<22} {previous:9.4f}s -> {seconds:9.4f}s ({change:+.1%}){marker}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m bench.run")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix", help="feature weights, e.g. links=2,code=0")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="allowed slowdown per stage before failing (default: 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        stages, counts = run_stages(root, args)
+    results = {
+        "config": {
+            "pages": args.pages,
+            "blocks": args.blocks,
+            "seed": args.seed,
+            "mix": parse_mix(args.mix),
+            "repeat": args.repeat,
+            "jobs": args.jobs,
+        },
+        "corpus": counts,
+        "python": platform.python_version(),
+        "stages": stages,
+    }
+
+    print(f"Corpus: {counts['pages']} pages, {counts['bytes']} bytes, {counts['blocks']} blocks")
+    for name, seconds in stages.items():
+        print(f"  {name:<22} {seconds:9.4f}s")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("config") != results["config"]:
+            print("Warning: baseline was recorded with a different configuration")
+        print(f"Compared with {args.baseline}:")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"FAILED: {len(regressions)} stage(s) regressed beyond {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1 @@
-python3 -m src.main
-cd docs && python3 -m http.server 8888
+python3 -m src.main serve --watch --port 8888
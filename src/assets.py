@@ -0,0 +1,75 @@
+import json
+import os
+
+from src.manifest import hash_bytes, hash_file
+from src.output import write_if_changed
+
+ASSET_MANIFEST = "asset-manifest.json"
+
+# Hex digits of the content hash kept in fingerprinted file names.
+_FINGERPRINT_LENGTH = 8
+
+
+def fingerprint_path(path, digest):
+    root, extension = os.path.splitext(path)
+    return f"{root}.{digest[:_FINGERPRINT_LENGTH]}{extension}"
+
+
+def file_fingerprint(path, cached=None):
+    # The hash recorded by the previous build is reused while the file's
+    # size and mtime are unchanged.
+    stat = os.stat(path)
+    if (
+        cached is not None
+        and cached.get("size") == stat.st_size
+        and cached.get("mtime") == stat.st_mtime_ns
+        and "hash" in cached
+    ):
+        digest = cached["hash"]
+    else:
+        digest = hash_file(path)
+    return {"source": path, "size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": digest}
+
+
+def fingerprint_tree(source, destination, cached=None):
+    cached = cached or {}
+    entries = {}
+    for directory, _, names in os.walk(source):
+        for name in names:
+            source_path = os.path.join(directory, name)
+            dest_path = os.path.join(destination, os.path.relpath(source_path, source))
+            entry = file_fingerprint(source_path, cached.get(source_path))
+            entries[fingerprint_path(dest_path, entry["hash"])] = entry
+    return entries
+
+
+def _url(path, root):
+    return "/" + os.path.relpath(path, root).replace(os.sep, "/")
+
+
+def asset_map(entries, source, destination):
+    return {
+        _url(entry["source"], source): _url(dest_path, destination)
+        for dest_path, entry in sorted(entries.items())
+        if "hash" in entry
+    }
+
+
+def hash_assets(assets):
+    if not assets:
+        return None
+    return hash_bytes(json.dumps(assets, sort_keys=True).encode())
+
+
+def write_asset_manifest(destination, assets, changed=None):
+    path = os.path.join(destination, ASSET_MANIFEST)
+    if assets is None:
+        if os.path.isfile(path):
+            os.remove(path)
+            if changed is not None:
+                changed.append(path)
+        return
+    data = json.dumps(assets, indent=1, sort_keys=True).encode()
+    written, _ = write_if_changed(path, data)
+    if written and changed is not None:
+        changed.append(path)
@@ -0,0 +1,147 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+from src.manifest import GENERATOR_VERSION
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Rows written or read since the last flush are kept in memory and written
+# in one transaction, so a page costs one write instead of one per block.
+_FLUSH_EVERY = 512
+
+_open_caches = {}
+
+
+def open_block_cache(path, max_bytes=DEFAULT_MAX_BYTES):
+    # One instance per process and path, so pool workers that receive a
+    # pickled cache keep a single connection and running counters.
+    key = (os.getpid(), os.path.abspath(path))
+    cache = _open_caches.get(key)
+    if cache is None:
+        cache = BlockCache(path, max_bytes)
+        _open_caches[key] = cache
+    # A resident process may be asked for a different size on a later build.
+    cache.max_bytes = max_bytes
+    return cache
+
+
+class BlockCache:
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._pending = {}
+        self._touched = {}
+
+    def __reduce__(self):
+        return open_block_cache, (self.path, self.max_bytes)
+
+    def _connect(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # The async build renders in a helper thread, so the connection
+            # may be opened there and used again from the main thread.
+            connection = sqlite3.connect(
+                self.path, timeout=60, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS blocks ("
+                "key TEXT PRIMARY KEY, html TEXT NOT NULL, "
+                "size INTEGER NOT NULL, used INTEGER NOT NULL, text TEXT)"
+            )
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(blocks)")}
+            if "text" not in columns:
+                connection.execute("ALTER TABLE blocks ADD COLUMN text TEXT")
+            connection.execute("CREATE INDEX IF NOT EXISTS blocks_used ON blocks (used)")
+            self._connection = connection
+        return self._connection
+
+    def key(self, block, namespace=""):
+        text = f"{GENERATOR_VERSION}\0{namespace}\0{block}"
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, key, with_text=False):
+        # With with_text, a block stored without its plain text is a miss
+        # and the result is an (html, text) pair.
+        row = self._pending.get(key)
+        if row is None:
+            row = self._connect().execute(
+                "SELECT html, text FROM blocks WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (with_text and row[1] is None):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key] = time.time_ns()
+        return tuple(row) if with_text else row[0]
+
+    def put(self, key, html, text=None):
+        self._pending[key] = (html, text)
+        self._touched[key] = time.time_ns()
+        if len(self._pending) + len(self._touched) >= _FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        if not self._pending and not self._touched:
+            return
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO blocks (key, html, size, used, text)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [
+                    (key, html, len(html) + len(text or ""), self._touched[key], text)
+                    for key, (html, text) in self._pending.items()
+                ],
+            )
+            connection.executemany(
+                "UPDATE blocks SET used = ? WHERE key = ?",
+                [
+                    (used, key)
+                    for key, used in self._touched.items()
+                    if key not in self._pending
+                ],
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._pending.clear()
+        self._touched.clear()
+
+    def evict(self):
+        # Drop least recently used blocks until the cache fits in max_bytes.
+        self.flush()
+        connection = self._connect()
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM blocks").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        victims = []
+        rows = connection.execute("SELECT key, size FROM blocks ORDER BY used").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        connection.execute("BEGIN IMMEDIATE")
+        connection.executemany("DELETE FROM blocks WHERE key = ?", victims)
+        connection.execute("COMMIT")
+        return len(victims)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,44 @@
+import json
+import os
+import socket
+import sys
+
+# Kept free of other src imports: this module is all a build through the
+# daemon loads, so it starts in a few milliseconds.
+
+SOCKET_PATH = "./.build/daemon.sock"
+
+
+def request(message, path=SOCKET_PATH):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall(json.dumps(message).encode())
+        connection.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := connection.recv(1 << 16):
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    stop = argv == ["--stop"]
+    message = {"stop": True} if stop else {"argv": argv, "cwd": os.getcwd()}
+    try:
+        response = request(message)
+    except (FileNotFoundError, ConnectionRefusedError):
+        if stop:
+            print("No build daemon is running", file=sys.stderr)
+            return 1
+        # Without a daemon the build runs in this process instead.
+        from src.main import main as build
+
+        build(argv)
+        return 0
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["status"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
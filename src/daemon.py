@@ -0,0 +1,100 @@
+import json
+import os
+import socket
+import socketserver
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+
+from src import pools
+from src.client import SOCKET_PATH
+
+# Subcommands that would block the daemon or start another one.
+_REJECTED = ("serve", "daemon")
+
+
+class _BuildHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        data = self.rfile.read()
+        if not data:
+            # A connection that sends nothing, such as _is_listening's probe.
+            return
+        message = json.loads(data)
+        response = self.server.respond(message)
+        self.wfile.write(json.dumps(response).encode())
+
+
+class BuildServer(socketserver.UnixStreamServer):
+    # Requests are handled one at a time on the main thread: builds use
+    # relative paths and per-process state, so they must not overlap.
+    def __init__(self, path, build):
+        super().__init__(path, _BuildHandler)
+        os.chmod(path, 0o600)
+        self.build = build
+        self.root = os.getcwd()
+        self.stopping = False
+
+    def respond(self, message):
+        if message.get("stop"):
+            self.stopping = True
+            return {"status": 0, "stdout": "Build daemon stopped\n", "stderr": ""}
+        argv = message["argv"]
+        if message["cwd"] != self.root:
+            return _error(f"The build daemon serves {self.root}, not {message['cwd']}")
+        if argv[:1] and argv[0] in _REJECTED:
+            return _error(f"The build daemon does not run '{argv[0]}'")
+        stdout, stderr = StringIO(), StringIO()
+        status = 0
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                self.build(argv)
+            except SystemExit as exit:
+                status = exit.code if isinstance(exit.code, int) else int(exit.code is not None)
+            except Exception:
+                traceback.print_exc()
+                status = 1
+                # A failed build may leave a broken pool behind.
+                pools.shutdown_pools()
+        return {"status": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    def serve_until_stopped(self):
+        while not self.stopping:
+            self.handle_request()
+
+
+def _error(text):
+    return {"status": 2, "stdout": "", "stderr": f"{text}\n"}
+
+
+def _is_listening(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+    return True
+
+
+def serve_builds(build, path=SOCKET_PATH):
+    # Imports, compiled templates, the block cache and render pools stay
+    # resident between builds; each request runs build(argv) as the CLI
+    # would.
+    if os.path.exists(path):
+        if _is_listening(path):
+            raise SystemExit(f"A build daemon is already listening on {path}")
+        os.remove(path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    pools.keep_pools()
+    server = BuildServer(path, build)
+    print(f"Build daemon listening on {path}; stop it with: python3 -m src.client --stop")
+    try:
+        server.serve_until_stopped()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
+        pools.keep_pools(False)
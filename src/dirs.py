@@ -0,0 +1,43 @@
+import os
+
+# Output directories this process has already created, by absolute path,
+# so pages sharing a directory pay for one makedirs between them. Entries
+# are dropped when remove_empty_dirs deletes the directory, which keeps
+# the set valid from build to build in a resident process.
+_created_dirs = set()
+
+
+def make_parent_dirs(path):
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory not in _created_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _created_dirs.add(directory)
+
+
+def forget_dir(path):
+    _created_dirs.discard(os.path.dirname(os.path.abspath(path)))
+
+
+def with_parent_dirs(path, function, *args):
+    # Calls function(*args) to create `path`, once more after recreating
+    # its directory if that was removed by something other than this
+    # process since it was remembered, such as a clean of the output.
+    make_parent_dirs(path)
+    try:
+        return function(*args)
+    except FileNotFoundError:
+        forget_dir(path)
+        make_parent_dirs(path)
+        return function(*args)
+
+
+def remove_empty_dirs(directory, root):
+    root = os.path.abspath(root)
+    directory = os.path.abspath(directory)
+    while directory != root and directory.startswith(root + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        _created_dirs.discard(directory)
+        directory = os.path.dirname(directory)
@@ -0,0 +1,150 @@
+import datetime
+import email.utils
+import os
+from xml.sax.saxutils import escape
+
+from src.assets import hash_assets
+from src.front_matter import split_front_matter
+from src.inline_markdown import text_to_textnode
+from src.manifest import GENERATOR_VERSION, hash_bytes
+from src.markdown_blocks import BlockType, iter_blocks
+from src.markdown_html import block_to_html, paragraph_text
+from src.output import write_if_changed
+from src.search import page_url
+from src.textnode import TextType
+from src.urls import UrlResolver
+
+SITEMAP = "sitemap.xml"
+FEED = "feed.xml"
+BLOG_DIR = "blog"
+
+
+def parse_date(value, source):
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise ValueError(f"{source}: invalid date {value!r}") from None
+
+
+def render_summary(source_path, resolve_url):
+    # The first paragraph with text of its own, skipping paragraphs that
+    # hold only links or images.
+    with open(source_path, "r") as file:
+        _, body = split_front_matter(file)
+        for block in iter_blocks(body):
+            if block.block_type != BlockType.PARAGRAPH:
+                continue
+            nodes = text_to_textnode(paragraph_text(block))
+            if any(node.text_type == TextType.TEXT and node.text.strip() for node in nodes):
+                return block_to_html(block, resolve_url)
+    return ""
+
+
+def is_post(source_path, content_dir):
+    # Pages below content/blog, except a listing page at blog/index.md.
+    blog = os.path.normpath(os.path.join(content_dir, BLOG_DIR))
+    source_path = os.path.normpath(source_path)
+    return (
+        os.path.commonpath([source_path, blog]) == blog
+        and os.path.dirname(source_path) != blog
+    )
+
+
+def post_summaries(manifest, posts, site_url, basepath, assets=None):
+    # Summaries are kept in the manifest under a key of the post's source
+    # hash and everything else that affects its HTML, so only new or
+    # edited posts are rendered. Feed readers show them away from the
+    # site, so root-relative URLs are made absolute against site_url.
+    resolve_url = UrlResolver(site_url + basepath, assets)
+    namespace = f"{GENERATOR_VERSION}\0{site_url}\0{basepath}\0{hash_assets(assets)}"
+    summaries = {}
+    rendered = 0
+    for dest, entry in posts:
+        source_hash = manifest.pages.get(dest, {}).get("source_hash")
+        key = hash_bytes(f"{namespace}\0{source_hash}".encode())
+        cached = manifest.summaries.get(dest)
+        if source_hash is not None and cached is not None and cached["key"] == key:
+            summaries[dest] = cached
+            continue
+        summaries[dest] = {"key": key, "html": render_summary(entry["source"], resolve_url)}
+        rendered += 1
+    manifest.summaries = summaries
+    return rendered
+
+
+def build_sitemap(pages):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for url, lastmod in pages:
+        lastmod = f"<lastmod>{lastmod.isoformat()}</lastmod>" if lastmod else ""
+        lines.append(f"<url><loc>{escape(url)}</loc>{lastmod}</url>")
+    lines.append("</urlset>")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def build_feed(title, link, description, items):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0">',
+        "<channel>",
+        f"<title>{escape(title)}</title>",
+        f"<link>{escape(link)}</link>",
+        f"<description>{escape(description)}</description>",
+    ]
+    for item_title, url, date, summary in items:
+        lines.append("<item>")
+        lines.append(f"<title>{escape(item_title)}</title>")
+        lines.append(f"<link>{escape(url)}</link>")
+        lines.append(f'<guid isPermaLink="true">{escape(url)}</guid>')
+        if date is not None:
+            moment = datetime.datetime.combine(date, datetime.time(), datetime.timezone.utc)
+            lines.append(f"<pubDate>{email.utils.format_datetime(moment)}</pubDate>")
+        lines.append(f"<description>{escape(summary)}</description>")
+        lines.append("</item>")
+    lines.extend(("</channel>", "</rss>"))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def write_feeds(manifest, content_dir, root, site_url, basepath, assets=None, changed=None):
+    # Built from the metadata index and cached summaries only; neither
+    # file carries a build time, so an unchanged site rewrites nothing.
+    site_url = site_url.rstrip("/")
+    pages = []
+    posts = []
+    for dest, entry in sorted(manifest.metadata.items()):
+        meta = entry["meta"]
+        date = meta.get("updated") or meta.get("date")
+        lastmod = parse_date(date, entry["source"]) if date else None
+        pages.append((site_url + page_url(dest, root, basepath), lastmod))
+        if is_post(entry["source"], content_dir):
+            posts.append((dest, entry))
+
+    rendered = post_summaries(manifest, posts, site_url, basepath, assets)
+    items = []
+    for dest, entry in posts:
+        meta = entry["meta"]
+        date = parse_date(meta["date"], entry["source"]) if meta.get("date") else None
+        summary = meta.get("summary") or manifest.summaries[dest]["html"]
+        url = site_url + page_url(dest, root, basepath)
+        items.append((meta["title"] or "", url, date, summary))
+    # Newest first; undated posts last, by path.
+    items.sort(key=lambda item: item[1])
+    items.sort(key=lambda item: item[2] or datetime.date.min, reverse=True)
+
+    home = manifest.metadata.get(os.path.join(root, "index.html"), {}).get("meta", {})
+    title = home.get("title") or site_url
+    feed = build_feed(title, site_url + basepath, home.get("description") or title, items)
+    written = []
+    for name, data in ((SITEMAP, build_sitemap(pages)), (FEED, feed)):
+        path = os.path.join(root, name)
+        if write_if_changed(path, data)[0]:
+            written.append(path)
+    if changed is not None:
+        changed.extend(written)
+    print(
+        f"Feeds: {len(pages)} page(s) in {SITEMAP}, {len(posts)} post(s) in {FEED},"
+        f" {rendered} summaries rendered, {len(written)} file(s) written"
+    )
+    return written
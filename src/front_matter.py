@@ -0,0 +1,62 @@
+import itertools
+import re
+
+FENCE = "---"
+
+_KEY = re.compile(r"([A-Za-z0-9_-]+):(?:\s+(.*))?$")
+_ITEM = re.compile(r"\s*-\s+(.*)$")
+
+
+def split_front_matter(lines):
+    # Reads the header region only: lines up to the closing fence. The
+    # body lines are returned as an iterator positioned after it.
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if first.rstrip("\r\n") != FENCE:
+        return {}, itertools.chain((first,), lines)
+    header = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line == FENCE:
+            return parse_front_matter(header), lines
+        header.append(line)
+    raise ValueError("Front matter is not closed with ---")
+
+
+def parse_front_matter(lines):
+    # A YAML-style subset: `key: value` scalars, quoted strings, inline
+    # `[a, b]` lists and block lists of `- item` lines under a bare `key:`.
+    metadata = {}
+    list_key = None
+    for number, line in enumerate(lines, 1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        item = _ITEM.match(line)
+        if item is not None and list_key is not None:
+            if metadata[list_key] is None:
+                metadata[list_key] = []
+            metadata[list_key].append(_scalar(item.group(1)))
+            continue
+        match = _KEY.match(line)
+        if match is None:
+            raise ValueError(f"Invalid front matter line {number}: {line!r}")
+        key, value = match.group(1), (match.group(2) or "").strip()
+        metadata[key] = _value(value) if value else None
+        list_key = None if value else key
+    return metadata
+
+
+def _value(text):
+    if text.startswith("[") and text.endswith("]"):
+        inner = text[1:-1].strip()
+        return [_scalar(item) for item in inner.split(",")] if inner else []
+    return _scalar(text)
+
+
+def _scalar(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    return text
@@ -1,22 +1,76 @@
+class _FrozenList(list):
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("The shared empty children list is immutable")
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+
+
+class _FrozenDict(dict):
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("The shared empty props dict is immutable")
+
+    clear = pop = popitem = setdefault = update = _immutable
+    __setitem__ = __delitem__ = __ior__ = _immutable
+
+
+# Shared by every node that has no children or props, so leaves do not each
+# allocate an empty list and dict.
+EMPTY_CHILDREN = _FrozenList()
+EMPTY_PROPS = _FrozenDict()
+
+
+def render_props(props):
+    if not props:
+        return ""
+    attributes = [f'{key}="{value}"' for key, value in props.items()]
+    return " " + " ".join(attributes)
+
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "_props", "_props_html")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
-        self.children = children if children is not None else []
-        self.props = props if props is not None else {}
+        self.children = children if children is not None else EMPTY_CHILDREN
+        self.props = props
+
+    @property
+    def props(self):
+        return self._props
+
+    @props.setter
+    def props(self, props):
+        # The attribute string is rendered on first use and kept until props
+        # are assigned again; edits in place are picked up until then.
+        self._props = props if props is not None else EMPTY_PROPS
+        self._props_html = None
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
         raise NotImplementedError
+
+    def write_html(self, stream):
+        stream.writelines(self.iter_html())
+
     def props_to_html(self):
-        if not self.props:
-            return ""
-        attributes = [f'{key}="{value}"' for key, value in self.props.items()]
-        return " " + " ".join(attributes)
+        if self._props_html is None:
+            self._props_html = render_props(self._props)
+        return self._props_html
 
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, props: {self.props})"
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, value=None, props=None):
         if value is None:
             raise ValueError("LeafNode must have a non-empty value")
@@ -30,23 +84,38 @@ class LeafNode(HTMLNode):
             return self.value
         props_html = self.props_to_html()
         return f"<{self.tag}{props_html}>{self.value}</{self.tag}>"
-    
+
+    def iter_html(self):
+        yield self.to_html()
+
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, props: {self.props})"
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         if not tag or not children:
             raise ValueError("All parent nodes must have non-empty tag and children")
 
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
-        if self.tag is None:
-            raise ValueError("Invalid HTML: ParentNode must have a tag")
-        if self.children is None:
-            raise ValueError("Invalid HTML: ParentNode must have children")
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+    def iter_html(self):
+        # Walk the tree with an explicit stack so deep trees neither recurse
+        # nor re-copy their children's HTML at every level.
+        stack = [(self, False)]
+        while stack:
+            node, closing = stack.pop()
+            if closing:
+                yield f"</{node.tag}>"
+                continue
+            if not isinstance(node, ParentNode):
+                yield from node.iter_html()
+                continue
+            if node.tag is None:
+                raise ValueError("Invalid HTML: ParentNode must have a tag")
+            if node.children is None:
+                raise ValueError("Invalid HTML: ParentNode must have children")
+            yield f"<{node.tag}{node.props_to_html()}>"
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.children))
@@ -98,7 +98,79 @@ def extract_markdown_links(text):
     return re.findall(pattern, text)
 
 
+_DELIMITERS = (
+    ("**", TextType.BOLD),
+    ("_", TextType.ITALIC),
+    ("*", TextType.ITALIC),
+    ("`", TextType.CODE),
+)
+
+_IMAGE_OR_LINK_PATTERN = re.compile(
+    r"!\[([^\[\]]*)\]\(([^\(\)]*)\)|(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
+)
+
+
 def text_to_textnode(text):
+    # Single pass over the text: each delimiter level only looks at the spans
+    # the previous level left as plain text, using offsets into the original
+    # string, so no intermediate node lists are built and every node is
+    # created exactly once. Produces the same nodes (and errors) as
+    # text_to_textnode_reference.
+    nodes = []
+    error_level = [len(_DELIMITERS)]
+    _scan_delimited(text, 0, len(text), 0, nodes, error_level)
+    if error_level[0] < len(_DELIMITERS):
+        delimiter = _DELIMITERS[error_level[0]][0]
+        raise ValueError(f"Markdown Error: No closing '{delimiter}' found.")
+    return nodes
+
+
+def _scan_delimited(text, start, end, level, nodes, error_level):
+    if level == len(_DELIMITERS):
+        _scan_images_and_links(text, start, end, nodes)
+        return
+    if level >= error_level[0]:
+        return
+
+    delimiter, text_type = _DELIMITERS[level]
+    if text.count(delimiter, start, end) % 2 == 1:
+        # The reference pipeline fails at the first level that has an
+        # unclosed delimiter anywhere, so keep scanning only shallower levels.
+        error_level[0] = level
+        return
+
+    position = start
+    inside = False
+    while True:
+        index = text.find(delimiter, position, end)
+        if index == -1:
+            index = end
+        if index > position:
+            if inside:
+                nodes.append(TextNode(text[position:index], text_type))
+            else:
+                _scan_delimited(text, position, index, level + 1, nodes, error_level)
+        if index == end:
+            return
+        position = index + len(delimiter)
+        inside = not inside
+
+
+def _scan_images_and_links(text, start, end, nodes):
+    position = start
+    for match in _IMAGE_OR_LINK_PATTERN.finditer(text, start, end):
+        if match.start() > position:
+            nodes.append(TextNode(text[position : match.start()], TextType.TEXT))
+        if match.group(1) is not None:
+            nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+        else:
+            nodes.append(TextNode(match.group(3), TextType.LINK, match.group(4)))
+        position = match.end()
+    if end > position:
+        nodes.append(TextNode(text[position:end], TextType.TEXT))
+
+
+def text_to_textnode_reference(text):
     nodes = [TextNode(text, TextType.TEXT)]
     nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
     nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
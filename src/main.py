@@ -1,75 +1,591 @@
+import argparse
 import os
-import shutil
 import sys
+from collections import deque
 
-from src.markdown_html import markdown_to_html_node
+from src import profiling
+from src.assets import asset_map, fingerprint_tree, hash_assets, write_asset_manifest
+from src.block_cache import DEFAULT_MAX_BYTES, open_block_cache
+from src.daemon import serve_builds
+from src.feeds import write_feeds
+from src.manifest import Manifest, hash_file
+from src.metadata import index_metadata, index_pages
+from src.output import write_changed_paths
+from src.page import generate_page
+from src.pipeline import instrumented, run_pipeline
+from src.pools import process_pool
+from src.postprocess import forget_minified_pages, postprocess_site
+from src.search import SearchIndex, page_url, remove_search_output, search_outputs
+from src.server import serve
+from src.shard import (
+    SITE_DIR,
+    load_partial_manifest,
+    merge_shards,
+    parse_shard,
+    save_partial_manifest,
+    select_shard,
+    shard_directory,
+)
+from src.static_sync import LINK_MODES, sync_directory
+from src.template import load_template
 
+MANIFEST_PATH = "./.build/manifest.json"
+BLOCK_CACHE_PATH = "./.build/blocks.sqlite"
+SHARDS_PATH = "./.build/shards"
+CHANGED_PATHS = "./.build/changed.txt"
+SEARCH_INDEX_PATH = "./.build/search.json"
+# Pages in flight per worker process, enough to keep every worker busy.
+PAGES_PER_JOB = 4
 
-def copy_directory(source, destination):
-    shutil.copytree(source, destination)
 
+def iter_pages(from_path, dest_path):
+    # Depth-first in sorted order without recursion. Only one directory's
+    # entries per level are held, and their types come from the DirEntry,
+    # so files cost no extra stat.
+    stack = [(_sorted_entries(from_path), dest_path)]
+    while stack:
+        entries, dest_dir = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+        elif entry.is_dir():
+            stack.append((_sorted_entries(entry.path), os.path.join(dest_dir, entry.name)))
+        elif entry.name.endswith(".md"):
+            dest_file = os.path.join(dest_dir, f"{os.path.splitext(entry.name)[0]}.html")
+            yield entry.path, dest_file
 
-def extract_title(markdown):
-    for line in markdown.splitlines():
-        if line.startswith("##"):
-            continue
-        if line.startswith("#"):
-            title = line[1:].strip()
-            if title:
-                return title
-    raise Exception("No h1 header found")
-
-
-def generate_page(from_path, template_path, dest_path, basepath):
-    if os.path.isdir(from_path):
-        for entry in os.listdir(from_path):
-            entry_path = os.path.join(from_path, entry)
-            if os.path.isdir(entry_path):
-                generate_page(
-                    entry_path, template_path, os.path.join(dest_path, entry), basepath
+
+def _sorted_entries(path):
+    with os.scandir(path) as entries:
+        return iter(sorted(entries, key=lambda entry: entry.name))
+
+
+def build_page(
+    source,
+    template_path,
+    dest,
+    basepath,
+    cache=None,
+    profile=False,
+    known_hash=None,
+    assets=None,
+    index=False,
+):
+    (written, output_hash), result = instrumented(
+        source,
+        cache,
+        profile,
+        index,
+        generate_page,
+        source,
+        template_path,
+        dest,
+        basepath,
+        cache,
+        known_hash,
+        assets,
+    )
+    result["written"] = written
+    result["output_hash"] = output_hash
+    return result
+
+
+def generate_pages(
+    work,
+    template_path,
+    basepath,
+    jobs,
+    cache=None,
+    profile=False,
+    io_workers=None,
+    assets=None,
+    index=False,
+):
+    if io_workers is not None:
+        yield from run_pipeline(
+            work, template_path, basepath, jobs, cache, profile, io_workers, assets, index
+        )
+        return
+    if jobs <= 1:
+        for source, dest, _, known_hash in work:
+            print(f"Generating page from {source} to {dest} using {template_path}")
+            try:
+                result = build_page(
+                    source,
+                    template_path,
+                    dest,
+                    basepath,
+                    cache,
+                    profile,
+                    known_hash,
+                    assets,
+                    index,
                 )
+            except Exception as error:
+                yield source, dest, error, {}
                 continue
-            if not entry.endswith(".md"):
-                continue
-            dest_file = os.path.join(dest_path, f"{os.path.splitext(entry)[0]}.html")
-            generate_page(entry_path, template_path, dest_file, basepath)
+            yield source, dest, None, result
         return
 
-    if not from_path.endswith(".md"):
-        return
+    # Pages are submitted a window at a time as the walk yields them, so
+    # neither the work nor its futures are held for the whole site.
+    window = PAGES_PER_JOB * jobs
+    with process_pool(jobs) as executor:
+        pending = deque()
+        for source, dest, _, known_hash in work:
+            print(f"Generating page from {source} to {dest} using {template_path}")
+            future = executor.submit(
+                build_page,
+                source,
+                template_path,
+                dest,
+                basepath,
+                cache,
+                profile,
+                known_hash,
+                assets,
+                index,
+            )
+            pending.append((source, dest, future))
+            if len(pending) >= window:
+                yield _page_result(*pending.popleft())
+        while pending:
+            yield _page_result(*pending.popleft())
+
+
+def _page_result(source, dest, future):
+    error = future.exception()
+    return source, dest, error, {} if error is not None else future.result()
+
+
+def generate_site(
+    from_path,
+    template_path,
+    dest_path,
+    basepath,
+    manifest,
+    jobs=1,
+    cache=None,
+    profile_records=None,
+    io_workers=None,
+    shard=None,
+    changed=None,
+    assets=None,
+    search_index=None,
+):
+    template_hash = load_template(template_path).content_hash()
+    assets_hash = hash_assets(assets)
+    pages = iter_pages(from_path, dest_path)
+    # Pages whose front matter cannot be read fail on their own, like a
+    # render error, and keep their previous output.
+    errors = []
+    failures = {}
+    if shard is not None:
+        pages = select_shard(list(pages), *shard)
+    else:
+        pages = index_pages(pages, manifest, failures)
+    # Pages are checked as the walk yields them and passed on to render
+    # straight away; only the set of output paths is kept for pruning, and
+    # source hashes until their page comes back.
+    live = set()
+    hashes = {}
+    skipped = 0
+
+    def stale_pages():
+        nonlocal skipped
+        for source, dest in pages:
+            live.add(dest)
+            if dest in failures:
+                print(f"Error generating {dest} from {source}: {failures[dest]!r}")
+                errors.append(failures[dest])
+                continue
+            source_hash = hash_file(source)
+            # A page missing from the search index, or counted from an older
+            # source, is rendered again to count its terms.
+            if manifest.is_fresh(
+                dest, source_hash, template_hash, basepath, assets_hash
+            ) and (search_index is None or search_index.has(dest, source_hash)):
+                skipped += 1
+                continue
+            hashes[dest] = source_hash
+            yield source, dest, source_hash, manifest.output_hash(dest)
+
+    rebuilt = 0
+    written = 0
+    cache_stats = {"hits": 0, "misses": 0}
+    profile = profile_records is not None
+    index = search_index is not None
+    for source, dest, error, result in generate_pages(
+        stale_pages(), template_path, basepath, jobs, cache, profile, io_workers, assets, index
+    ):
+        source_hash = hashes.pop(dest)
+        for name, count in result.get("cache", {}).items():
+            cache_stats[name] += count
+        if "profile" in result:
+            profile_records.append(result["profile"])
+        if error is not None:
+            print(f"Error generating {dest} from {source}: {error!r}")
+            errors.append(error)
+            continue
+        manifest.record(
+            dest,
+            source,
+            source_hash,
+            template_hash,
+            basepath,
+            result["output_hash"],
+            assets_hash,
+        )
+        if index:
+            search_index.update(
+                dest, page_url(dest, dest_path, basepath), result["search"], source_hash
+            )
+        rebuilt += 1
+        if result["written"]:
+            written += 1
+            if changed is not None:
+                changed.append(dest)
+    if errors:
+        raise RuntimeError(f"{len(errors)} page(s) failed to build") from errors[0]
+
+    removed = manifest.prune(live, dest_path)
+    for dest in removed:
+        print(f"Removed stale page {dest}")
+    if search_index is not None:
+        # Pages dropped from the manifest directly, such as when
+        # minification is turned off, are no longer in pages either.
+        for dest in set(search_index.pages) - live:
+            search_index.remove(dest)
+    if changed is not None:
+        changed.extend(removed)
+    print(
+        f"Pages: {rebuilt} rebuilt ({written} written), {skipped} skipped,"
+        f" {len(removed)} removed"
+    )
+    if cache is not None:
+        evicted = cache.evict()
+        print(
+            f"Block cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses,"
+            f" {evicted} evicted"
+        )
+    return rebuilt, skipped, len(removed)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m src.main")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="render pages in N worker processes (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--io-workers",
+        type=int,
+        metavar="N",
+        help="overlap reads and writes with rendering in an asyncio pipeline"
+        " with N concurrent reads and writes (default: off)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="K/N",
+        help="build only shard K of N into its own directory; combine them with 'merge'",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        default=SHARDS_PATH,
+        help="directory holding one subdirectory per shard (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--hash-static",
+        action="store_true",
+        help="compare static files by content hash when size matches but mtime differs",
+    )
+    parser.add_argument(
+        "--link",
+        choices=LINK_MODES,
+        default="copy",
+        help="how to place static files in the output (default: copy)",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="copy static files to content-hashed names and rewrite references to them",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="minify rendered pages, leaving pre, code, script and style content alone",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write precompressed .gz (and .br when brotli is installed) siblings"
+        " of HTML, CSS and JS outputs",
+    )
+    parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help="write sitemap.xml and an RSS feed of content/blog with absolute URLs"
+        " under URL, e.g. https://example.org",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="write a prefix-sharded full-text search index and its client to search/",
+    )
+    parser.add_argument(
+        "--no-block-cache",
+        dest="block_cache",
+        action="store_false",
+        help="render every block instead of reusing cached block HTML",
+    )
+    parser.add_argument(
+        "--block-cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="maximum size of the block cache in MiB (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="TRACE",
+        help="time every page and stage and write a Chrome trace-event JSON file",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="number of slowest pages to list with --profile (default: 10)",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.io_workers is not None and args.io_workers < 1:
+        parser.error("--io-workers must be at least 1")
+    if args.search_index and args.shard is not None:
+        parser.error("--search-index cannot be combined with --shard")
+    return args
+
+
+def parse_serve_args(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m src.main serve")
+    parser.add_argument("--host", default="")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--basepath", default="/")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="re-render changed pages and live-reload open browsers",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.25,
+        help="seconds between polls for changes (default: 0.25)",
+    )
+    return parser.parse_args(argv)
 
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    with open(from_path, "r") as file:
-        markdown = file.read()
-    with open(template_path, "r") as file:
-        template = file.read()
 
-    html = markdown_to_html_node(markdown).to_html()
-    title = extract_title(markdown)
-    page = template.replace("{{ Title }}", title).replace("{{ Content }}", html)
-    page = page.replace('href="/', f'href="{basepath}').replace(
-        'src="/', f'src="{basepath}'
+def parse_merge_args(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m src.main merge")
+    parser.add_argument("shards", nargs="+", metavar="SHARD_DIR")
+    parser.add_argument(
+        "--hash-static",
+        action="store_true",
+        help="compare static files by content hash when size matches but mtime differs",
     )
+    parser.add_argument(
+        "--link",
+        choices=LINK_MODES,
+        default="copy",
+        help="how to place pages and static files in the output (default: copy)",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="copy static files to content-hashed names and rewrite references to them",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="minify rendered pages, leaving pre, code, script and style content alone",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write precompressed .gz (and .br when brotli is installed) siblings"
+        " of HTML, CSS and JS outputs",
+    )
+    parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help="write sitemap.xml and an RSS feed of content/blog with absolute URLs"
+        " under URL, e.g. https://example.org",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_daemon_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python3 -m src.main daemon",
+        description="Keep a build server running for this directory. Build through it with"
+        " 'python3 -m src.client [build options]'.",
+    )
+    return parser.parse_args(argv)
+
 
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir:
-        os.makedirs(dest_dir, exist_ok=True)
-    with open(dest_path, "w") as file:
-        file.write(page)
+def merge(args, dest):
+    manifest = Manifest.load(MANIFEST_PATH)
+    changed = []
+    try:
+        forget_minified_pages(manifest, args.minify)
+        print("Syncing static files to public directory...")
+        sync_directory(
+            "./static",
+            dest,
+            manifest,
+            args.hash_static,
+            args.link,
+            changed=changed,
+            fingerprint=args.fingerprint,
+        )
+        assets = asset_map(manifest.static, "./static", dest) if args.fingerprint else None
+        write_asset_manifest(dest, assets, changed)
+        merge_shards(args.shards, dest, manifest, args.link, changed, hash_assets(assets))
+        index_metadata(iter_pages("./content", dest), manifest)
+        if args.site_url:
+            # The shards were checked to share one basepath.
+            basepath = next((entry["basepath"] for entry in manifest.pages.values()), "/")
+            write_feeds(manifest, "./content", dest, args.site_url, basepath, assets, changed)
+        # Shards build no search index, so a merged site has none either.
+        remove_search_output(dest, changed)
+        postprocess_site(manifest, args.minify, args.compress, changed=changed)
+        write_changed_paths(CHANGED_PATHS, changed, dest)
+    finally:
+        manifest.save()
 
 
-def main():
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "serve":
+        args = parse_serve_args(argv[1:])
+        serve(
+            "./content",
+            "./static",
+            "./template.html",
+            args.host,
+            args.port,
+            args.basepath,
+            args.watch,
+            args.interval,
+        )
+        return
+    if argv and argv[0] == "merge":
+        merge(parse_merge_args(argv[1:]), "./docs")
+        return
+    if argv and argv[0] == "daemon":
+        parse_daemon_args(argv[1:])
+        serve_builds(main)
+        return
+
+    args = parse_args(argv)
     src = "./static"
     dest = "./docs"
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
-
-    print("Deleting public directory...")
-    if os.path.exists(dest):
-        shutil.rmtree(dest)
+    basepath = args.basepath
 
-    print("Copying static files to public directory...")
-    copy_directory(src, dest)
-    generate_page("./content", "./template.html", "./docs", basepath)
+    assets = None
+    if args.shard is not None:
+        # A shard renders only its pages, into its own directory and
+        # manifest; static files are synced when the shards are merged.
+        shard_dir = shard_directory(args.shard_dir, args.shard[0])
+        dest = os.path.join(shard_dir, SITE_DIR)
+        manifest = load_partial_manifest(shard_dir)
+        # Hashed up front, so the finally block below cannot fail on a
+        # broken template before the shard's manifest is saved.
+        template_hash = load_template("./template.html").content_hash()
+        if args.fingerprint:
+            # Hashes from the shard's last build are reused for unchanged
+            # files, as sync_directory does for a full build.
+            cached = {entry["source"]: entry for entry in manifest.static.values()}
+            manifest.static = fingerprint_tree(src, dest, cached)
+            assets = asset_map(manifest.static, src, dest)
+    else:
+        manifest = Manifest.load(MANIFEST_PATH)
+    cache = None
+    if args.block_cache:
+        cache = open_block_cache(BLOCK_CACHE_PATH, args.block_cache_size * 1024 * 1024)
+    profile_records = [] if args.profile else None
+    search_index = SearchIndex.load(SEARCH_INDEX_PATH) if args.search_index else None
+    changed = []
+    try:
+        if args.shard is None:
+            forget_minified_pages(manifest, args.minify)
+            print("Syncing static files to public directory...")
+            sync_directory(
+                src,
+                dest,
+                manifest,
+                args.hash_static,
+                args.link,
+                changed=changed,
+                fingerprint=args.fingerprint,
+            )
+            if args.fingerprint:
+                assets = asset_map(manifest.static, src, dest)
+            write_asset_manifest(dest, assets, changed)
+        generate_site(
+            "./content",
+            "./template.html",
+            dest,
+            basepath,
+            manifest,
+            args.jobs,
+            cache,
+            profile_records,
+            args.io_workers,
+            args.shard,
+            changed,
+            assets,
+            search_index,
+        )
+        if search_index is not None:
+            search_index.write(dest, changed)
+        elif args.shard is None:
+            remove_search_output(dest, changed)
+        if args.site_url and args.shard is None:
+            write_feeds(manifest, "./content", dest, args.site_url, basepath, assets, changed)
+        if args.shard is None:
+            postprocess_site(
+                manifest,
+                args.minify,
+                args.compress,
+                changed=changed,
+                generated=search_outputs(dest),
+            )
+            write_changed_paths(CHANGED_PATHS, changed, dest)
+    finally:
+        if profile_records is not None:
+            profiling.write_trace(args.profile, profile_records)
+            profiling.print_summary(profile_records, args.profile_top)
+            print(f"Wrote trace to {args.profile}")
+        if args.shard is not None:
+            save_partial_manifest(
+                manifest,
+                shard_dir,
+                *args.shard,
+                basepath,
+                template_hash,
+                hash_assets(assets),
+            )
+        else:
+            manifest.save()
+        if search_index is not None:
+            search_index.save()
+        if cache is not None:
+            cache.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+
+from src.dirs import remove_empty_dirs
+
+# Bump whenever a change to the generator alters the HTML it produces, so
+# every page recorded by an older generator is rebuilt.
+GENERATOR_VERSION = "3"
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    def __init__(
+        self,
+        path,
+        pages=None,
+        static=None,
+        shard=None,
+        processed=None,
+        metadata=None,
+        summaries=None,
+    ):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.static = static if static is not None else {}
+        self.shard = shard
+        self.processed = processed if processed is not None else {}
+        self.metadata = metadata if metadata is not None else {}
+        self.summaries = summaries if summaries is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or not isinstance(data.get("pages"), dict):
+            return cls(path)
+        return cls(
+            path,
+            data["pages"],
+            data.get("static"),
+            data.get("shard"),
+            data.get("processed"),
+            data.get("metadata"),
+            data.get("summaries"),
+        )
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            data = {
+                "pages": self.pages,
+                "static": self.static,
+                "processed": self.processed,
+                "metadata": self.metadata,
+                "summaries": self.summaries,
+            }
+            if self.shard is not None:
+                data["shard"] = self.shard
+            json.dump(data, file, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, dest_path, source_hash, template_hash, basepath, assets_hash=None):
+        entry = self.pages.get(dest_path)
+        if entry is None:
+            return False
+        return (
+            entry.get("generator") == GENERATOR_VERSION
+            and entry.get("source_hash") == source_hash
+            and entry.get("template_hash") == template_hash
+            and entry.get("basepath") == basepath
+            and entry.get("assets_hash") == assets_hash
+            and os.path.isfile(dest_path)
+        )
+
+    def record(
+        self,
+        dest_path,
+        source_path,
+        source_hash,
+        template_hash,
+        basepath,
+        output_hash=None,
+        assets_hash=None,
+    ):
+        self.pages[dest_path] = {
+            "source": source_path,
+            "source_hash": source_hash,
+            "template_hash": template_hash,
+            "basepath": basepath,
+            "generator": GENERATOR_VERSION,
+            "output_hash": output_hash,
+            "assets_hash": assets_hash,
+        }
+
+    def output_hash(self, dest_path):
+        return self.pages.get(dest_path, {}).get("output_hash")
+
+    def prune(self, live_outputs, root):
+        removed = []
+        for dest_path in sorted(set(self.pages) - set(live_outputs)):
+            del self.pages[dest_path]
+            if os.path.isfile(dest_path):
+                os.remove(dest_path)
+                remove_empty_dirs(os.path.dirname(dest_path), root)
+            removed.append(dest_path)
+        return removed
+
@@ -1,5 +1,12 @@
+import re
+from array import array
 from enum import Enum
 from src.htmlnode import HTMLNode
+from src.profiling import stage
+
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+
+_NON_SPACE = re.compile(r"\S")
 
 
 class BlockType(Enum):
@@ -11,49 +18,194 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 
+class Block:
+    # A block is a span of `source` plus the offsets of each of its lines,
+    # stored flat as [start0, end0, start1, end1, ...]. Renderers slice only
+    # the text they emit instead of splitting and re-joining the block.
+    __slots__ = ("block_type", "source", "start", "end", "lines", "start_line")
+
+    def __init__(self, block_type, source, start, end, lines, start_line=0):
+        self.block_type = block_type
+        self.source = source
+        self.start = start
+        self.end = end
+        self.lines = lines
+        self.start_line = start_line
+
+    @classmethod
+    def from_text(cls, text, block_type=None):
+        lines = array("q")
+        position = 0
+        while True:
+            newline = text.find("\n", position)
+            if newline == -1:
+                lines.append(position)
+                lines.append(len(text))
+                break
+            lines.append(position)
+            lines.append(newline)
+            position = newline + 1
+        block = cls(block_type, text, 0, len(text), lines)
+        if block_type is None:
+            block.block_type = classify_block(block)
+        return block
+
+    @property
+    def text(self):
+        return self.source[self.start : self.end]
+
+    @property
+    def end_line(self):
+        return self.start_line + len(self.lines) // 2
+
+    def line_count(self):
+        return len(self.lines) // 2
+
+    def iter_lines(self):
+        lines = self.lines
+        for index in range(0, len(lines), 2):
+            yield lines[index], lines[index + 1]
+
+    def __eq__(self, other):
+        if not isinstance(other, Block):
+            return NotImplemented
+        return (
+            self.block_type == other.block_type
+            and self.text == other.text
+            and self.start_line == other.start_line
+            and self.end_line == other.end_line
+        )
+
+    def __repr__(self):
+        return (
+            f"Block({self.block_type}, {self.text!r}, "
+            f"lines {self.start_line}-{self.end_line})"
+        )
+
+
 def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    cleaned_blocks = []
-    for block in blocks:
-        if block == "":
-            continue
-        block = block.strip()
-        cleaned_blocks.append(block)
-    expanded_blocks = []
-    for block in cleaned_blocks:
-        lines = [line.strip() for line in block.split("\n") if line.strip()]
-        if lines and all(
-            line.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### "))
-            for line in lines
-        ):
-            expanded_blocks.extend(lines)
+    return [block.text for block in scan_blocks(markdown)]
+
+
+def scan_blocks(source):
+    # Blocks are runs of lines separated by empty lines. Line offsets are
+    # found with str.find, so no per-line strings are created.
+    pending = array("q")
+    start_line = 0
+    number = 0
+    position = 0
+    length = len(source)
+    while position <= length:
+        newline = source.find("\n", position)
+        if newline == -1:
+            newline = length
+        if newline == position:
+            if pending:
+                yield from _finish_block(source, pending, start_line)
+                pending = array("q")
         else:
-            expanded_blocks.append(block)
-    return expanded_blocks
+            if not pending:
+                start_line = number
+            pending.append(position)
+            pending.append(newline)
+        position = newline + 1
+        number += 1
+    if pending:
+        yield from _finish_block(source, pending, start_line)
 
 
-def block_to_block_type(block):
-    lines = block.split("\n")
-    if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
+def iter_blocks(lines):
+    # Streaming version of scan_blocks: only the block being scanned is held
+    # in memory. `lines` may be a list of strings or an open file.
+    pending = []
+    start_line = 0
+    for number, line in enumerate(lines):
+        if line.endswith("\n"):
+            line = line[:-1]
+        if line == "":
+            if pending:
+                yield from _finish_joined(pending, start_line)
+                pending = []
+            continue
+        if not pending:
+            start_line = number
+        pending.append(line)
+    if pending:
+        yield from _finish_joined(pending, start_line)
+
+
+def _finish_joined(lines, start_line):
+    source = "\n".join(lines)
+    offsets = array("q")
+    position = 0
+    for line in lines:
+        offsets.append(position)
+        offsets.append(position + len(line))
+        position += len(line) + 1
+    return _finish_block(source, offsets, start_line)
+
+
+def _strip_span(source, start, end):
+    if not source[start].isspace() and not source[end - 1].isspace():
+        return start, end
+    match = _NON_SPACE.search(source, start, end)
+    if match is None:
+        return None
+    start = match.start()
+    while source[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _finish_block(source, offsets, start_line):
+    content = []
+    for index in range(0, len(offsets), 2):
+        span = _strip_span(source, offsets[index], offsets[index + 1])
+        if span is not None:
+            content.append((index, span))
+    if not content:
+        return
+
+    if all(source.startswith(HEADING_PREFIXES, *span) for _, span in content):
+        for index, (start, end) in content:
+            lines = array("q", (start, end))
+            yield Block(BlockType.HEADING, source, start, end, lines, start_line + index // 2)
+        return
+
+    (first, (start, _)), (last, (_, end)) = content[0], content[-1]
+    lines = offsets[first : last + 2]
+    lines[0] = start
+    lines[-1] = end
+    block = Block(None, source, start, end, lines, start_line + first // 2)
+    with stage("classify"):
+        block.block_type = classify_block(block)
+    yield block
+
+
+def classify_block(block):
+    source, start, end, lines = block.source, block.start, block.end, block.lines
+    count = len(lines) // 2
+    if source.startswith(HEADING_PREFIXES, start, end):
         return BlockType.HEADING
-    if len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
+    if (
+        count > 1
+        and source.startswith("```", lines[0], lines[1])
+        and source.startswith("```", lines[-2], lines[-1])
+    ):
         return BlockType.CODE
-    if block.startswith(">"):
-        for line in lines:
-            if not line.startswith(">"):
-                return BlockType.PARAGRAPH
-        return BlockType.QUOTE
-    if block.startswith("- "):
-        for line in lines:
-            if not line.startswith("- "):
+    for prefix, block_type in ((">", BlockType.QUOTE), ("- ", BlockType.UNORDERED_LIST)):
+        if source.startswith(prefix, start, end):
+            for index in range(0, len(lines), 2):
+                if not source.startswith(prefix, lines[index], lines[index + 1]):
+                    return BlockType.PARAGRAPH
+            return block_type
+    if source.startswith("1. ", start, end):
+        for number, index in enumerate(range(0, len(lines), 2), 1):
+            if not source.startswith(f"{number}. ", lines[index], lines[index + 1]):
                 return BlockType.PARAGRAPH
-        return BlockType.UNORDERED_LIST
-    if block.startswith("1. "):
-        i = 1
-        for line in lines:
-            if not line.startswith(f"{i}. "):
-                return BlockType.PARAGRAPH
-            i += 1
         return BlockType.ORDERED_LIST
     return BlockType.PARAGRAPH
 
+
+def block_to_block_type(block):
+    return Block.from_text(block).block_type
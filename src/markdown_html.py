@@ -1,93 +1,224 @@
 from src.htmlnode import HTMLNode, LeafNode, ParentNode
-from src.textnode import TextNode, TextType, text_node_to_html
+from src.textnode import TextNode, TextType, text_node_to_html, text_node_to_html_string
 from src.inline_markdown import text_to_textnode
-from src.markdown_blocks import markdown_to_blocks, block_to_block_type, BlockType
+from src.markdown_blocks import Block, BlockType, iter_blocks, scan_blocks
+from src.profiling import stage, timed_iter
+from src import search
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+def markdown_to_html_node(markdown, cache=None, resolve_url=None):
     children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
+    for block in scan_blocks(markdown):
+        html_node = cached_block_to_html_node(block, cache, resolve_url)
         children.append(html_node)
     return ParentNode("div", children, None)
 
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+def iter_markdown_html(lines, cache=None, resolve_url=None):
+    # Render block by block, straight to HTML strings: no node tree is
+    # built on this path.
+    blocks = timed_iter("split", iter_blocks(timed_iter("read", lines)))
+    first = next(blocks, None)
+    if first is None:
+        raise ValueError("All parent nodes must have non-empty tag and children")
+    yield "<div>"
+    with stage("serialize"):
+        html = cached_block_to_html(first, cache, resolve_url)
+    yield html
+    for block in blocks:
+        with stage("serialize"):
+            html = cached_block_to_html(block, cache, resolve_url)
+        yield html
+    yield "</div>"
+
+def cached_block_to_html_node(block, cache=None, resolve_url=None):
+    with stage("tree"):
+        if cache is None:
+            return block_record_to_html_node(block, resolve_url)
+        return LeafNode(None, cached_block_to_html(block, cache, resolve_url))
+
+def cached_block_to_html(block, cache=None, resolve_url=None):
+    if cache is None:
+        return block_to_html(block, resolve_url)
+    # Rendered URLs depend on the resolver, so the part of it this block
+    # uses is in the key.
+    namespace = resolve_url.block_key(block.text) if resolve_url is not None else ""
+    key = cache.key(block.text, namespace)
+    # While a search index is built, a cached block also carries its
+    # plain text, so a hit still feeds the index.
+    indexing = search.is_collecting()
+    if indexing:
+        html, text = cache.get(key, with_text=True) or (None, None)
+    else:
+        html, text = cache.get(key), None
+    if html is None:
+        position = search.mark() if indexing else None
+        html = block_to_html(block, resolve_url)
+        cache.put(key, html, search.collected_since(position) if indexing else None)
+    else:
+        search.collect(text)
+    return html
+
+def block_to_html_node(block, block_type=None, resolve_url=None):
+    return block_record_to_html_node(Block.from_text(block, block_type), resolve_url)
+
+def block_record_to_html_node(block, resolve_url=None):
+    block_type = block.block_type
     if block_type == BlockType.PARAGRAPH:
-        return block_to_paragraph(block)
+        return paragraph_from_block(block, resolve_url)
     if block_type == BlockType.HEADING:
-        return block_to_heading(block)
+        return heading_from_block(block, resolve_url)
     if block_type == BlockType.CODE:
-        return block_to_code(block)
+        return code_from_block(block)
     if block_type == BlockType.QUOTE:
-        return block_to_quote(block)
+        return quote_from_block(block, resolve_url)
     if block_type == BlockType.UNORDERED_LIST:
-        return block_to_ul(block)
+        return ul_from_block(block, resolve_url)
     if block_type == BlockType.ORDERED_LIST:
-        return block_to_ol(block)
+        return ol_from_block(block, resolve_url)
     raise ValueError("Invalid block type")
 
-def text_to_children(text):
-    text_nodes = text_to_textnode(text)
+def text_to_children(text, resolve_url=None):
+    with stage("inline"):
+        text_nodes = text_to_textnode(text)
+    search.collect_nodes(text_nodes)
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html(text_node)
+        html_node = text_node_to_html(text_node, resolve_url)
         children.append(html_node)
     return children
 
-def block_to_paragraph(block):
-    lines = block.split("\n")
-    paragraph = " ".join(lines)
-    children = text_to_children(paragraph)
-    return ParentNode("p", children)
+def block_to_paragraph(block, resolve_url=None):
+    return paragraph_from_block(Block.from_text(block, BlockType.PARAGRAPH), resolve_url)
+
+def block_to_heading(block, resolve_url=None):
+    return heading_from_block(Block.from_text(block, BlockType.HEADING), resolve_url)
+
+def block_to_code(block):
+    return code_from_block(Block.from_text(block, BlockType.CODE))
 
-def block_to_heading(block):
+def block_to_quote(block, resolve_url=None):
+    return quote_from_block(Block.from_text(block, BlockType.QUOTE), resolve_url)
+
+def block_to_ul(block, resolve_url=None):
+    return ul_from_block(Block.from_text(block, BlockType.UNORDERED_LIST), resolve_url)
+
+def block_to_ol(block, resolve_url=None):
+    return ol_from_block(Block.from_text(block, BlockType.ORDERED_LIST), resolve_url)
+
+# The span helpers work on a Block's offsets and slice only the text the
+# renderers emit. Both the node renderers (*_from_block) and the direct
+# renderer (block_to_html) use them, so the two produce the same HTML.
+
+def paragraph_text(block):
+    source = block.source
+    if block.line_count() == 1:
+        return source[block.start : block.end]
+    return " ".join(source[start:end] for start, end in block.iter_lines())
+
+def heading_parts(block):
+    source, start, end = block.source, block.start, block.end
     level = 0
-    for char in block:
-        if char == "#":
-            level += 1
-        else:
-            break
-    if len(block) <= level or block[level] != " ":
+    while start + level < end and source[start + level] == "#":
+        level += 1
+    if end - start <= level or source[start + level] != " ":
         raise ValueError(f"Invalid heading level: {level}")
-    text = block[level + 1 :].strip()
-    children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
+    return level, source[start + level + 1 : end].strip()
 
-def block_to_code(block):
-    if not block.startswith("```") or not block.endswith("```"):
+def code_text(block):
+    source, start, end = block.source, block.start, block.end
+    if (
+        end - start < 3
+        or not source.startswith("```", start, end)
+        or not source.endswith("```", start, end)
+    ):
         raise ValueError("Invalid code block")
-    text = block[3:-3]
-    if text.startswith("\n"):
-        text = text[1:]
-    code = LeafNode("code", text)
-    return ParentNode("pre", [code])
+    start += 3
+    end -= 3
+    if start < end and source[start] == "\n":
+        start += 1
+    return source[start:end]
 
-def block_to_quote(block):
-    lines = block.split("\n")
+def quote_text(block):
+    source = block.source
     new_lines = []
-    for line in lines:
-        if not line.startswith(">"):
+    for start, end in block.iter_lines():
+        if not source.startswith(">", start, end):
             raise ValueError("Invalid quote block")
-        new_lines.append(line.lstrip(">").strip())
-    content = " ".join(new_lines)
-    children = text_to_children(content)
+        new_lines.append(source[start:end].lstrip(">").strip())
+    return " ".join(new_lines)
+
+def ul_items(block):
+    source = block.source
+    for start, end in block.iter_lines():
+        yield source[start + 2 : end]
+
+def ol_items(block):
+    source = block.source
+    for start, end in block.iter_lines():
+        separator = source.find(". ", start, end)
+        if separator == -1:
+            raise ValueError("Invalid ordered list item")
+        yield source[separator + 2 : end]
+
+def paragraph_from_block(block, resolve_url=None):
+    children = text_to_children(paragraph_text(block), resolve_url)
+    return ParentNode("p", children)
+
+def heading_from_block(block, resolve_url=None):
+    level, text = heading_parts(block)
+    children = text_to_children(text, resolve_url)
+    return ParentNode(f"h{level}", children)
+
+def code_from_block(block):
+    text = code_text(block)
+    search.collect(text)
+    code = LeafNode("code", text)
+    return ParentNode("pre", [code])
+
+def quote_from_block(block, resolve_url=None):
+    children = text_to_children(quote_text(block), resolve_url)
     return ParentNode("blockquote", children)
 
-def block_to_ul(block):
-    items = block.split("\n")
+def ul_from_block(block, resolve_url=None):
     html_items = []
-    for item in items:
-        text = item[2:]
-        children = text_to_children(text)
-        html_items.append(ParentNode("li", children))
+    for item in ul_items(block):
+        html_items.append(ParentNode("li", text_to_children(item, resolve_url)))
     return ParentNode("ul", html_items)
 
-def block_to_ol(block):
-    items = block.split("\n")
+def ol_from_block(block, resolve_url=None):
     html_items = []
-    for item in items:
-        text = item.split(". ", 1)[1]
-        children = text_to_children(text)
-        html_items.append(ParentNode("li", children))
+    for item in ol_items(block):
+        html_items.append(ParentNode("li", text_to_children(item, resolve_url)))
     return ParentNode("ol", html_items)
+
+# The direct renderer goes from blocks and TextNodes to HTML strings
+# without building HTMLNode objects. It must stay byte-identical to
+# markdown_to_html_node, errors included; tests compare the two.
+
+def block_to_html(block, resolve_url=None):
+    block_type = block.block_type
+    if block_type == BlockType.PARAGRAPH:
+        return f"<p>{text_to_html(paragraph_text(block), resolve_url)}</p>"
+    if block_type == BlockType.HEADING:
+        level, text = heading_parts(block)
+        return f"<h{level}>{text_to_html(text, resolve_url)}</h{level}>"
+    if block_type == BlockType.CODE:
+        text = code_text(block)
+        search.collect(text)
+        return f"<pre><code>{text}</code></pre>"
+    if block_type == BlockType.QUOTE:
+        return f"<blockquote>{text_to_html(quote_text(block), resolve_url)}</blockquote>"
+    if block_type == BlockType.UNORDERED_LIST:
+        items = "".join(f"<li>{text_to_html(item, resolve_url)}</li>" for item in ul_items(block))
+        return f"<ul>{items}</ul>"
+    if block_type == BlockType.ORDERED_LIST:
+        items = "".join(f"<li>{text_to_html(item, resolve_url)}</li>" for item in ol_items(block))
+        return f"<ol>{items}</ol>"
+    raise ValueError("Invalid block type")
+
+def text_to_html(text, resolve_url=None):
+    with stage("inline"):
+        text_nodes = text_to_textnode(text)
+    if not text_nodes:
+        raise ValueError("All parent nodes must have non-empty tag and children")
+    search.collect_nodes(text_nodes)
+    return "".join([text_node_to_html_string(node, resolve_url) for node in text_nodes])
@@ -0,0 +1,79 @@
+import os
+
+from src.page import read_header
+
+
+def read_metadata(source_path, cached=None):
+    # Only the front matter (and, without a title there, the lines up to
+    # the first h1) is read. Entries are reused while the source's size
+    # and mtime are unchanged.
+    stat = os.stat(source_path)
+    if (
+        cached is not None
+        and cached.get("size") == stat.st_size
+        and cached.get("mtime") == stat.st_mtime_ns
+    ):
+        return cached, False
+    with open(source_path, "r") as file:
+        try:
+            header = read_header(file)
+        except ValueError as error:
+            raise ValueError(f"{source_path}: {error}") from error
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns, "meta": header}, True
+
+
+def index_pages(pages, manifest, failures=None):
+    # Refreshes manifest.metadata, keyed by output path, passing each page
+    # on once it is indexed so a lazy walk stays lazy. The index is
+    # replaced when the pages run out. With a `failures` dict, pages whose
+    # front matter cannot be read are recorded there by output path, and
+    # keep their previous entry, instead of raising.
+    entries = {}
+    read = 0
+    for source, dest in pages:
+        previous = manifest.metadata.get(dest)
+        if previous is not None and previous.get("source") != source:
+            previous = None
+        try:
+            entry, changed = read_metadata(source, previous)
+        except ValueError as error:
+            if failures is None:
+                raise
+            failures[dest] = error
+            if previous is not None:
+                entries[dest] = previous
+            yield source, dest
+            continue
+        entries[dest] = dict(entry, source=source)
+        read += changed
+        yield source, dest
+    removed = len(set(manifest.metadata) - set(entries))
+    manifest.metadata = entries
+    print(f"Metadata: {read} read, {len(entries) - read} reused, {removed} removed")
+    return read, len(entries) - read, removed
+
+
+def index_metadata(pages, manifest):
+    indexed = index_pages(pages, manifest)
+    while True:
+        try:
+            next(indexed)
+        except StopIteration as stop:
+            return stop.value
+
+
+def listing(manifest, key=None, value=None):
+    # Pages' metadata, newest first by their `date`, optionally only those
+    # whose `key` equals or contains `value`; enough for listing pages
+    # without touching post bodies.
+    pages = []
+    for dest, entry in manifest.metadata.items():
+        meta = entry["meta"]
+        if key is not None:
+            field = meta.get(key)
+            if field != value and not (isinstance(field, list) and value in field):
+                continue
+        pages.append(dict(meta, dest=dest))
+    pages.sort(key=lambda page: page["dest"])
+    pages.sort(key=lambda page: str(page.get("date") or ""), reverse=True)
+    return pages
@@ -0,0 +1,102 @@
+import hashlib
+import os
+
+from src.dirs import with_parent_dirs
+from src.manifest import hash_bytes, hash_file
+
+# Rendered fragments are joined into chunks of about this many characters
+# before they are encoded, hashed and written.
+_CHUNK = 1 << 16
+
+def open_output(path):
+    return with_parent_dirs(path, open, path, "wb")
+
+
+def write_atomic(path, data):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open_output(tmp_path) as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def is_unchanged(path, digest, known_hash=None):
+    # The manifest's hash is trusted while the file exists; without one the
+    # file on disk is hashed instead.
+    if not os.path.isfile(path):
+        return False
+    if known_hash is not None:
+        return known_hash == digest
+    return hash_file(path) == digest
+
+
+def write_if_changed(path, data, known_hash=None):
+    digest = hash_bytes(data)
+    if is_unchanged(path, digest, known_hash):
+        return False, digest
+    write_atomic(path, data)
+    return True, digest
+
+
+class OutputFile:
+    # A text stream that is written to a temporary file and hashed on the
+    # way. On close it replaces `path` only if the content changed, so
+    # readers never see a half-written file and unchanged files keep their
+    # mtime.
+    def __init__(self, path, known_hash=None):
+        self.path = path
+        self.known_hash = known_hash
+        self.tmp_path = f"{path}.tmp{os.getpid()}"
+        self.digest = hashlib.sha256()
+        self.file = None
+        self.changed = None
+        self.hash = None
+
+    def __enter__(self):
+        self.file = open_output(self.tmp_path)
+        return self
+
+    def write(self, text):
+        data = text.encode()
+        self.digest.update(data)
+        self.file.write(data)
+
+    def writelines(self, fragments):
+        batch = []
+        size = 0
+        for fragment in fragments:
+            batch.append(fragment)
+            size += len(fragment)
+            if size >= _CHUNK:
+                self.write("".join(batch))
+                batch = []
+                size = 0
+        if batch:
+            self.write("".join(batch))
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.file.close()
+        if exc_type is not None:
+            os.remove(self.tmp_path)
+            return
+        self.hash = self.digest.hexdigest()
+        self.changed = not is_unchanged(self.path, self.hash, self.known_hash)
+        if self.changed:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+
+def write_changed_paths(path, changed, root):
+    # One path per line, relative to the output root, for deploy steps that
+    # upload changed files and delete files that no longer exist.
+    lines = sorted({os.path.relpath(dest, root).replace(os.sep, "/") for dest in changed})
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_atomic(path, "".join(f"{line}\n" for line in lines).encode())
+    print(f"Changed paths: {len(lines)} written to {path}")
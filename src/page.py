@@ -0,0 +1,79 @@
+import io
+
+from src.front_matter import split_front_matter
+from src.markdown_html import iter_markdown_html
+from src.output import OutputFile
+from src import search
+from src.profiling import stage, timed_stream
+from src.template import load_template
+from src.urls import UrlResolver
+
+
+def extract_title(markdown):
+    return require_title(read_header(markdown.splitlines()))
+
+
+def find_title(lines):
+    for line in lines:
+        if line.startswith("##"):
+            continue
+        if line.startswith("#"):
+            title = line[1:].strip()
+            if title:
+                return title
+    return None
+
+
+def read_header(lines):
+    # Front matter plus the title, which the front matter may set and
+    # otherwise is the first h1 (None without one). Reading stops there.
+    metadata, body = split_front_matter(lines)
+    if not metadata.get("title"):
+        metadata["title"] = find_title(body)
+    return metadata
+
+
+def require_title(header):
+    if header["title"] is None:
+        raise Exception("No h1 header found")
+    return header["title"]
+
+
+def read_title(from_path):
+    with stage("read"), open(from_path, "r") as file:
+        return require_title(read_header(file))
+
+
+def render_page(from_path, template, basepath, stream, title=None, cache=None, assets=None):
+    # The source is read twice, line by line, instead of being loaded whole:
+    # once for the title and once while streaming the rendered blocks.
+    if title is None:
+        title = read_title(from_path)
+    with open(from_path, "r") as source:
+        _, body = split_front_matter(source)
+        write_page(body, title, template, basepath, stream, cache, assets)
+
+
+def render_markdown(markdown, template, basepath, stream, cache=None, assets=None):
+    title = require_title(read_header(io.StringIO(markdown)))
+    _, body = split_front_matter(io.StringIO(markdown))
+    write_page(body, title, template, basepath, stream, cache, assets)
+
+
+def write_page(lines, title, template, basepath, stream, cache=None, assets=None):
+    resolve_url = UrlResolver(basepath, assets)
+    search.set_title(title)
+    content = iter_markdown_html(lines, cache, resolve_url)
+    values = {"Title": title, "Content": content}
+    template.write(timed_stream(stream), values, resolve_url)
+
+
+def generate_page(
+    from_path, template_path, dest_path, basepath, cache=None, known_hash=None, assets=None
+):
+    template = load_template(template_path)
+    title = read_title(from_path)
+
+    with OutputFile(dest_path, known_hash) as output:
+        render_page(from_path, template, basepath, output, title, cache, assets)
+    return output.changed, output.hash
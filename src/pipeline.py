@@ -0,0 +1,192 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src import profiling, search
+from src.output import write_if_changed
+from src.page import render_markdown
+from src.pools import process_pool
+from src.template import load_template
+
+DEFAULT_IO_WORKERS = 8
+
+
+def instrumented(source, cache, profile, index, render, *args):
+    result = {}
+    if profile:
+        profiling.start_page(source)
+    if index:
+        search.start_page()
+    if cache is not None:
+        hits, misses = cache.hits, cache.misses
+    try:
+        value = render(*args)
+        if cache is not None:
+            cache.flush()
+    finally:
+        if profile:
+            result["profile"] = profiling.finish_page()
+        if index:
+            result["search"] = search.finish_page()
+    if cache is not None:
+        result["cache"] = {"hits": cache.hits - hits, "misses": cache.misses - misses}
+    return value, result
+
+
+def read_source(path):
+    with open(path, "r") as file:
+        return file.read()
+
+
+def render_source(
+    source,
+    markdown,
+    template_path,
+    basepath,
+    cache=None,
+    profile=False,
+    assets=None,
+    index=False,
+):
+    def render():
+        stream = io.StringIO()
+        template = load_template(template_path)
+        render_markdown(markdown, template, basepath, stream, cache, assets)
+        return stream.getvalue()
+
+    return instrumented(source, cache, profile, index, render)
+
+
+def _timed(function, *args):
+    # Timed inside the worker thread, so time spent waiting for a free
+    # thread is not charged to the page.
+    start = time.perf_counter()
+    value = function(*args)
+    return value, time.perf_counter() - start
+
+
+def _charge(result, name, seconds):
+    # Reads and writes happen outside the render worker, so their time is
+    # added to the page's profile here.
+    record = result.get("profile")
+    if record is not None:
+        record["stages"][name] += seconds
+        record["wall"] += seconds
+
+
+async def build_pages(
+    work,
+    template_path,
+    basepath,
+    jobs=1,
+    cache=None,
+    profile=False,
+    io_workers=DEFAULT_IO_WORKERS,
+    queue_size=None,
+    assets=None,
+    index=False,
+):
+    # Readers, renderers and writers are connected by bounded queues, so at
+    # most io_workers + queue_size sources and as many rendered pages are
+    # held in memory while reads and writes overlap with rendering.
+    if queue_size is None:
+        queue_size = 2 * io_workers
+    loop = asyncio.get_running_loop()
+    loaded = asyncio.Queue(queue_size)
+    rendered = asyncio.Queue(queue_size)
+    pending = iter(work)
+    results = []
+
+    io_pool = ThreadPoolExecutor(io_workers)
+    # A single render thread keeps the event loop free to schedule I/O;
+    # more jobs render in worker processes as in the synchronous build.
+    render_executor = process_pool(jobs) if jobs > 1 else ThreadPoolExecutor(1)
+
+    async def read():
+        for source, dest, _, known_hash in pending:
+            print(f"Generating page from {source} to {dest} using {template_path}")
+            try:
+                markdown, seconds = await loop.run_in_executor(
+                    io_pool, _timed, read_source, source
+                )
+            except Exception as error:
+                results.append((source, dest, error, {}))
+                continue
+            await loaded.put((source, dest, known_hash, markdown, seconds))
+
+    async def render():
+        while (item := await loaded.get()) is not None:
+            source, dest, known_hash, markdown, read_seconds = item
+            try:
+                html, result = await loop.run_in_executor(
+                    render_pool,
+                    render_source,
+                    source,
+                    markdown,
+                    template_path,
+                    basepath,
+                    cache,
+                    profile,
+                    assets,
+                    index,
+                )
+            except Exception as error:
+                results.append((source, dest, error, {}))
+                continue
+            _charge(result, "read", read_seconds)
+            await rendered.put((source, dest, known_hash, html, result))
+
+    async def write():
+        while (item := await rendered.get()) is not None:
+            source, dest, known_hash, html, result = item
+            try:
+                (written, output_hash), seconds = await loop.run_in_executor(
+                    io_pool, _timed, write_if_changed, dest, html.encode(), known_hash
+                )
+            except Exception as error:
+                results.append((source, dest, error, result))
+                continue
+            _charge(result, "write", seconds)
+            result["written"] = written
+            result["output_hash"] = output_hash
+            results.append((source, dest, None, result))
+
+    with io_pool, render_executor as render_pool:
+        readers = [asyncio.create_task(read()) for _ in range(io_workers)]
+        renderers = [asyncio.create_task(render()) for _ in range(jobs)]
+        writers = [asyncio.create_task(write()) for _ in range(io_workers)]
+        await asyncio.gather(*readers)
+        for _ in renderers:
+            await loaded.put(None)
+        await asyncio.gather(*renderers)
+        for _ in writers:
+            await rendered.put(None)
+        await asyncio.gather(*writers)
+    return results
+
+
+def run_pipeline(
+    work,
+    template_path,
+    basepath,
+    jobs=1,
+    cache=None,
+    profile=False,
+    io_workers=DEFAULT_IO_WORKERS,
+    assets=None,
+    index=False,
+):
+    return asyncio.run(
+        build_pages(
+            work,
+            template_path,
+            basepath,
+            jobs,
+            cache,
+            profile,
+            io_workers,
+            assets=assets,
+            index=index,
+        )
+    )
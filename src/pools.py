@@ -0,0 +1,33 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+# Render pools kept alive between builds while the build daemon runs. It is
+# None otherwise, and every build starts and shuts down its own pool.
+_resident = None
+
+
+def keep_pools(keep=True):
+    global _resident
+    if keep:
+        if _resident is None:
+            _resident = {}
+        return
+    shutdown_pools()
+    _resident = None
+
+
+def process_pool(jobs):
+    # A context manager giving a pool of `jobs` worker processes.
+    if _resident is None:
+        return ProcessPoolExecutor(max_workers=jobs)
+    pool = _resident.get(jobs)
+    if pool is None:
+        pool = _resident[jobs] = ProcessPoolExecutor(max_workers=jobs)
+    return nullcontext(pool)
+
+
+def shutdown_pools():
+    if _resident:
+        for pool in _resident.values():
+            pool.shutdown()
+        _resident.clear()
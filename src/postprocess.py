@@ -0,0 +1,174 @@
+import gzip
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from src.manifest import hash_bytes
+from src.output import write_atomic
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = (".html", ".css", ".js")
+SIBLING_FORMATS = ("gz", "br")
+
+# Elements whose content is kept byte for byte, comments, and other tags,
+# whose quoted attribute values may hold a ">".
+_TOKEN = re.compile(
+    r"<(pre|code|textarea|script|style)\b.*?</\1\s*>|<!--.*?-->"
+    r"|<(?:[^>\"']|\"[^\"]*\"|'[^']*')*>",
+    re.DOTALL | re.IGNORECASE,
+)
+# Whitespace next to these tags is not rendered, so it can be dropped.
+_BLOCK_TAG = re.compile(
+    r"</?(?:!doctype|address|article|aside|blockquote|body|br|dd|div|dl|dt|footer"
+    r"|h[1-6]|head|header|hr|html|li|link|main|meta|nav|ol|p|pre|section|table"
+    r"|tbody|td|th|thead|title|tr|ul)\b",
+    re.IGNORECASE,
+)
+# HTML whitespace only: a non-breaking space is content.
+_SPACE = re.compile(r"[ \t\n\r\f]+")
+
+
+def minify_html(html):
+    tokens = []
+    position = 0
+    for match in _TOKEN.finditer(html):
+        if match.start() > position:
+            _append_text(tokens, html[position : match.start()])
+        token = match.group()
+        position = match.end()
+        if token.startswith("<!--") and not token.startswith("<!--[if"):
+            continue
+        tokens.append((bool(_BLOCK_TAG.match(token)), token))
+    if position < len(html):
+        _append_text(tokens, html[position:])
+
+    output = []
+    last = len(tokens) - 1
+    for index, (block, token) in enumerate(tokens):
+        if block is not None:
+            output.append(token)
+            continue
+        text = _SPACE.sub(" ", token)
+        if index == 0 or tokens[index - 1][0]:
+            text = text.lstrip(" ")
+        if index == last or tokens[index + 1][0]:
+            text = text.rstrip(" ")
+        output.append(text)
+    return "".join(output)
+
+
+def _append_text(tokens, text):
+    # Text on both sides of a dropped comment is merged, so its whitespace
+    # collapses together.
+    if tokens and tokens[-1][0] is None:
+        tokens[-1] = (None, tokens[-1][1] + text)
+    else:
+        tokens.append((None, text))
+
+
+def compression_formats():
+    return SIBLING_FORMATS if brotli is not None else ("gz",)
+
+
+def compress(data, file_format):
+    if file_format == "gz":
+        return gzip.compress(data, 9, mtime=0)
+    if file_format == "br":
+        return brotli.compress(data)
+    raise ValueError(f"Unknown compression format: {file_format}")
+
+
+def remove_siblings(path, keep=()):
+    removed = []
+    for file_format in SIBLING_FORMATS:
+        sibling = f"{path}.{file_format}"
+        if file_format not in keep and os.path.isfile(sibling):
+            os.remove(sibling)
+            removed.append(sibling)
+    return removed
+
+
+def process_file(path, minify, formats, previous):
+    with open(path, "rb") as file:
+        data = file.read()
+    entry = {"hash": hash_bytes(data), "minify": minify, "formats": list(formats)}
+    if previous == entry and all(os.path.isfile(f"{path}.{fmt}") for fmt in formats):
+        return entry, None
+    written = []
+    if minify:
+        minified = minify_html(data.decode()).encode()
+        if minified != data:
+            data = minified
+            write_atomic(path, data)
+            entry["hash"] = hash_bytes(data)
+            written.append(path)
+    for file_format in formats:
+        sibling = f"{path}.{file_format}"
+        write_atomic(sibling, compress(data, file_format))
+        written.append(sibling)
+    written.extend(remove_siblings(path, formats))
+    return entry, written
+
+
+def forget_minified_pages(manifest, minify):
+    # Minification rewrites pages in place, so turning it off must rebuild
+    # the pages it touched.
+    if minify:
+        return
+    for path, entry in manifest.processed.items():
+        if entry.get("minify"):
+            manifest.pages.pop(path, None)
+
+
+def postprocess_site(
+    manifest, minify=False, compress=False, jobs=8, changed=None, generated=()
+):
+    # Rendered pages may be minified; every HTML, CSS and JS output, and
+    # each `generated` file outside the manifest, gets compressed siblings.
+    # Files whose hash and options match the manifest are skipped.
+    formats = compression_formats() if compress else ()
+    if not minify and not formats and not manifest.processed:
+        return 0, 0, 0
+    outputs = {}
+    if minify or formats:
+        for path in manifest.pages:
+            if path.endswith(".html"):
+                outputs[path] = minify
+        for path in manifest.static:
+            if path.endswith(COMPRESSIBLE):
+                outputs[path] = False
+        for path in generated:
+            outputs[path] = False
+
+    processed = 0
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            path: executor.submit(
+                process_file, path, page_minify, formats, manifest.processed.get(path)
+            )
+            for path, page_minify in outputs.items()
+            if os.path.isfile(path)
+        }
+        entries = {}
+        for path, future in futures.items():
+            entries[path], written = future.result()
+            if written is not None:
+                processed += 1
+                if changed is not None:
+                    changed.extend(written)
+
+    removed = 0
+    for path in sorted(set(manifest.processed) - set(entries)):
+        siblings = remove_siblings(path)
+        if changed is not None:
+            changed.extend(siblings)
+        removed += 1
+    manifest.processed = entries
+
+    skipped = len(entries) - processed
+    print(f"Post-processing: {processed} processed, {skipped} skipped, {removed} removed")
+    return processed, skipped, removed
@@ -0,0 +1,206 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+STAGES = (
+    "read",
+    "split",
+    "classify",
+    "inline",
+    "tree",
+    "serialize",
+    "template",
+    "write",
+)
+
+# The profile of the page being rendered in this process, or None when
+# profiling is off. Instrumented code checks it once per call, so a build
+# without --profile only pays for that check.
+_current = None
+_started_tracing = False
+
+_NULL_STAGE = nullcontext()
+
+
+class PageProfile:
+    def __init__(self, source):
+        self.source = source
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.stages["other"] = 0.0
+        self.stack = ["other"]
+        self.started = time.time()
+        self.mark = time.perf_counter()
+        self.start = self.mark
+
+    def enter(self, name):
+        # Time is charged to the innermost open stage only, so nested stages
+        # (inline parsing inside tree building) are not counted twice.
+        now = time.perf_counter()
+        self.stages[self.stack[-1]] += now - self.mark
+        self.stack.append(name)
+        self.mark = now
+
+    def exit(self):
+        now = time.perf_counter()
+        self.stages[self.stack.pop()] += now - self.mark
+        self.mark = now
+
+    def record(self, peak_memory):
+        self.exit()
+        return {
+            "source": self.source,
+            "pid": os.getpid(),
+            "started": self.started,
+            "wall": self.mark - self.start,
+            "stages": self.stages,
+            "peak_memory": peak_memory,
+        }
+
+
+class _Stage:
+    __slots__ = ("profile", "name")
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.profile.enter(self.name)
+
+    def __exit__(self, *exc_info):
+        self.profile.exit()
+
+
+class _TimedStream:
+    def __init__(self, stream, profile):
+        self.stream = stream
+        self.profile = profile
+
+    def write(self, text):
+        self.profile.enter("write")
+        try:
+            return self.stream.write(text)
+        finally:
+            self.profile.exit()
+
+    def writelines(self, fragments):
+        for fragment in timed_iter("template", fragments):
+            self.write(fragment)
+
+
+def stage(name):
+    if _current is None:
+        return _NULL_STAGE
+    return _Stage(_current, name)
+
+
+def timed_iter(name, iterable):
+    if _current is None:
+        return iterable
+    return _timed_iter(_current, name, iter(iterable))
+
+
+def _timed_iter(profile, name, iterator):
+    while True:
+        profile.enter(name)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            profile.exit()
+        yield item
+
+
+def timed_stream(stream):
+    if _current is None:
+        return stream
+    return _TimedStream(stream, _current)
+
+
+def start_page(source):
+    # Tracing started here is stopped again by finish_page, so resident
+    # workers do not keep tracing every allocation between builds.
+    global _current, _started_tracing
+    _started_tracing = not tracemalloc.is_tracing()
+    if _started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    _current = PageProfile(source)
+
+
+def finish_page():
+    global _current, _started_tracing
+    profile, _current = _current, None
+    peak = tracemalloc.get_traced_memory()[1]
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+    return profile.record(peak)
+
+
+def write_trace(path, records):
+    events = []
+    for record in records:
+        start = record["started"] * 1e6
+        events.append(
+            {
+                "name": record["source"],
+                "cat": "page",
+                "ph": "X",
+                "ts": start,
+                "dur": record["wall"] * 1e6,
+                "pid": record["pid"],
+                "tid": record["pid"],
+                "args": {
+                    "peak_memory": record["peak_memory"],
+                    **{name: seconds * 1e3 for name, seconds in record["stages"].items()},
+                },
+            }
+        )
+        # Stage totals are laid out back to back under their page; they are
+        # sums over the page, not individual intervals.
+        offset = start
+        for name, seconds in record["stages"].items():
+            if seconds <= 0:
+                continue
+            events.append(
+                {
+                    "name": name,
+                    "cat": "stage",
+                    "ph": "X",
+                    "ts": offset,
+                    "dur": seconds * 1e6,
+                    "pid": record["pid"],
+                    "tid": record["pid"],
+                }
+            )
+            offset += seconds * 1e6
+    with open(path, "w") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+def print_summary(records, top=10):
+    if not records:
+        print("Profile: no pages were rendered")
+        return
+    totals = dict.fromkeys(records[0]["stages"], 0.0)
+    for record in records:
+        for name, seconds in record["stages"].items():
+            totals[name] += seconds
+    wall = sum(record["wall"] for record in records)
+    print(f"Profile: {len(records)} page(s), {wall * 1e3:.1f} ms total render time")
+    for name, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+        share = seconds / wall if wall else 0
+        print(f"  {name:<10} {seconds * 1e3:9.1f} ms  {share:6.1%}")
+    peak = max(record["peak_memory"] for record in records)
+    print(f"  peak traced memory {peak / 1024:.0f} KiB")
+    print(f"Slowest {min(top, len(records))} page(s):")
+    for record in sorted(records, key=lambda record: -record["wall"])[:top]:
+        slowest = max(record["stages"].items(), key=lambda item: item[1])[0]
+        print(
+            f"  {record['wall'] * 1e3:8.1f} ms  {record['peak_memory'] / 1024:7.0f} KiB"
+            f"  {slowest:<10} {record['source']}"
+        )
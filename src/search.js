@@ -0,0 +1,53 @@
+// Client for the build-time search index. Include it with
+//   <script src="{basepath}search/search.js"></script>
+// and call siteSearch("query"), which resolves to [{url, title, score}].
+// Only index.json and the shards for the query's term prefixes are fetched.
+(() => {
+  const root = document.currentScript.src.replace(/[^/]*$/, "");
+  const shards = new Map();
+  let index = null;
+
+  const fetchJson = (name) => fetch(root + name).then((response) => response.json());
+
+  const loadShard = (prefix) => {
+    if (!shards.has(prefix)) {
+      shards.set(prefix, fetchJson(encodeURIComponent(prefix) + ".json"));
+    }
+    return shards.get(prefix);
+  };
+
+  window.siteSearch = async (query) => {
+    index = index || (await fetchJson("index.json"));
+    const terms = (query.toLowerCase().match(/[\p{L}\p{N}_]+/gu) || []).filter(
+      (term) => term.length >= index.min_length
+    );
+    let scores = null;
+    for (const term of terms) {
+      const prefix = term.slice(0, index.prefix);
+      const postings = index.shards.includes(prefix) ? await loadShard(prefix) : {};
+      // The last term of the query also matches as a prefix.
+      const isLast = term === terms[terms.length - 1];
+      const matches = new Map();
+      for (const [word, list] of Object.entries(postings)) {
+        if (word !== term && !(isLast && word.startsWith(term))) continue;
+        for (let i = 0; i < list.length; i += 2) {
+          matches.set(list[i], (matches.get(list[i]) || 0) + list[i + 1]);
+        }
+      }
+      if (scores !== null) {
+        for (const [doc, count] of matches) {
+          if (scores.has(doc)) matches.set(doc, count + scores.get(doc));
+          else matches.delete(doc);
+        }
+      }
+      scores = matches;
+    }
+    if (scores === null) return [];
+    return [...scores]
+      .map(([doc, score]) => {
+        const [url, title] = index.docs[doc];
+        return { url, title, score };
+      })
+      .sort((a, b) => b.score - a.score);
+  };
+})();
@@ -0,0 +1,222 @@
+import json
+import os
+import re
+import shutil
+from collections import Counter
+
+from src.output import write_if_changed
+
+SEARCH_DIR = "search"
+PREFIX_LENGTH = 2
+MIN_TERM_LENGTH = 2
+
+_WORD = re.compile(r"\w+")
+_CLIENT_PATH = os.path.join(os.path.dirname(__file__), "search.js")
+
+# The text of the page being rendered in this process, or None when no
+# index is being built. Renderers feed it the TextNode text they already
+# produce, so indexing needs no second parse.
+_current = None
+
+
+class _PageText:
+    __slots__ = ("title", "fragments")
+
+    def __init__(self):
+        self.title = None
+        self.fragments = []
+
+
+def start_page():
+    global _current
+    _current = _PageText()
+
+
+def finish_page():
+    global _current
+    page, _current = _current, None
+    return {"title": page.title, "terms": count_terms(" ".join(page.fragments))}
+
+
+def is_collecting():
+    return _current is not None
+
+
+def set_title(title):
+    if _current is not None:
+        _current.title = title
+
+
+def collect(text):
+    if _current is not None:
+        _current.fragments.append(text)
+
+
+def collect_nodes(text_nodes):
+    if _current is not None:
+        _current.fragments.extend(node.text for node in text_nodes)
+
+
+def mark():
+    return len(_current.fragments)
+
+
+def collected_since(position):
+    return " ".join(_current.fragments[position:])
+
+
+def count_terms(text):
+    words = _WORD.findall(text.lower())
+    return dict(Counter(word for word in words if len(word) >= MIN_TERM_LENGTH))
+
+
+def page_url(dest_path, root, basepath):
+    relative = os.path.relpath(dest_path, root).replace(os.sep, "/")
+    if relative == "index.html" or relative.endswith("/index.html"):
+        relative = relative[: -len("index.html")]
+    return basepath + relative
+
+
+class SearchIndex:
+    # Per-page term counts are kept between builds, so a rebuild only
+    # recounts rendered pages and rewrites the shards whose terms changed.
+    def __init__(self, path, pages=None, next_id=0, dirty=()):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.next_id = next_id
+        self.dirty = set(dirty)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+            return cls(path, data["pages"], data["next_id"], data.get("dirty", ()))
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls(path)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Prefixes not yet written, e.g. after a failed build, are kept
+        # for the next one.
+        data = {"pages": self.pages, "next_id": self.next_id, "dirty": sorted(self.dirty)}
+        write_if_changed(self.path, json.dumps(data, sort_keys=True).encode())
+
+    def has(self, dest_path, source_hash):
+        # Entries are only current if counted from this version of the
+        # source; a build without the index may have changed it since.
+        page = self.pages.get(dest_path)
+        return page is not None and page.get("source_hash") == source_hash
+
+    def _touch(self, terms):
+        self.dirty.update(term[:PREFIX_LENGTH] for term in terms)
+
+    def update(self, dest_path, url, record, source_hash):
+        old = self.pages.get(dest_path)
+        if old is None:
+            page_id = self.next_id
+            self.next_id += 1
+        else:
+            page_id = old["id"]
+            if old["terms"] == record["terms"] and old["url"] == url:
+                old["title"] = record["title"]
+                old["source_hash"] = source_hash
+                return
+            self._touch(old["terms"])
+        self._touch(record["terms"])
+        self.pages[dest_path] = {
+            "id": page_id,
+            "url": url,
+            "title": record["title"],
+            "terms": record["terms"],
+            "source_hash": source_hash,
+        }
+
+    def remove(self, dest_path):
+        old = self.pages.pop(dest_path, None)
+        if old is not None:
+            self._touch(old["terms"])
+
+    def write(self, root, changed=None):
+        directory = os.path.join(root, SEARCH_DIR)
+        os.makedirs(directory, exist_ok=True)
+        written = []
+
+        prefixes = set()
+        for page in self.pages.values():
+            prefixes.update(term[:PREFIX_LENGTH] for term in page["terms"])
+        stale = self.dirty | {
+            prefix
+            for prefix in prefixes
+            if not os.path.isfile(os.path.join(directory, f"{prefix}.json"))
+        }
+
+        shards = {prefix: {} for prefix in stale & prefixes}
+        for page in sorted(self.pages.values(), key=lambda page: page["id"]):
+            for term, count in page["terms"].items():
+                postings = shards.get(term[:PREFIX_LENGTH])
+                if postings is not None:
+                    postings.setdefault(term, []).extend((page["id"], count))
+        for prefix, postings in shards.items():
+            path = os.path.join(directory, f"{prefix}.json")
+            data = json.dumps(postings, sort_keys=True, separators=(",", ":"))
+            if write_if_changed(path, data.encode())[0]:
+                written.append(path)
+        for name in sorted(os.listdir(directory)):
+            prefix, extension = os.path.splitext(name)
+            if extension == ".json" and name != "index.json" and prefix not in prefixes:
+                path = os.path.join(directory, name)
+                os.remove(path)
+                written.append(path)
+
+        index = {
+            "prefix": PREFIX_LENGTH,
+            "min_length": MIN_TERM_LENGTH,
+            "docs": {page["id"]: [page["url"], page["title"]] for page in self.pages.values()},
+            "shards": sorted(prefixes),
+        }
+        for name, data in (
+            ("index.json", json.dumps(index, sort_keys=True, separators=(",", ":")).encode()),
+            ("search.js", _read_client()),
+        ):
+            path = os.path.join(directory, name)
+            if write_if_changed(path, data)[0]:
+                written.append(path)
+
+        self.dirty.clear()
+        if changed is not None:
+            changed.extend(written)
+        print(
+            f"Search index: {len(self.pages)} page(s), {len(prefixes)} shard(s),"
+            f" {len(written)} file(s) written"
+        )
+        return written
+
+
+def _read_client():
+    with open(_CLIENT_PATH, "rb") as file:
+        return file.read()
+
+
+def search_outputs(root):
+    # The files SearchIndex.write leaves in the output, for post-processing.
+    directory = os.path.join(root, SEARCH_DIR)
+    if not os.path.isdir(directory):
+        return []
+    return [
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if name.endswith((".json", ".js"))
+    ]
+
+
+def remove_search_output(root, changed=None):
+    # Building without the index drops what an earlier build wrote.
+    directory = os.path.join(root, SEARCH_DIR)
+    if not os.path.isdir(directory):
+        return
+    if changed is not None:
+        changed.extend(os.path.join(directory, name) for name in sorted(os.listdir(directory)))
+    shutil.rmtree(directory)
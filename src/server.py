@@ -0,0 +1,212 @@
+import html
+import io
+import mimetypes
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from src.page import render_page
+from src.template import load_template
+
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = (
+    "<script>new EventSource(\"" + LIVERELOAD_PATH + "\")"
+    ".onmessage = () => location.reload();</script>"
+)
+
+
+def iter_sources(root, suffix=None):
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if suffix is None or name.endswith(suffix):
+                yield os.path.join(directory, name)
+
+
+def page_url(source, content_dir):
+    relative = os.path.splitext(os.path.relpath(source, content_dir))[0] + ".html"
+    return "/" + relative.replace(os.sep, "/")
+
+
+class DevSite:
+    def __init__(self, content_dir, static_dir, template_path, basepath="/", live_reload=True):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.basepath = basepath
+        self.live_reload = live_reload
+        self.template = None
+        self.pages = {}
+        self.sources = {}
+        self.static_mtimes = {}
+        self.version = 0
+        self.changed = threading.Condition()
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        template = load_template(self.template_path)
+        template_changed = template is not self.template
+        self.template = template
+
+        rebuilt = []
+        seen = set()
+        for source in iter_sources(self.content_dir, ".md"):
+            seen.add(source)
+            mtime = os.stat(source).st_mtime_ns
+            known = self.sources.get(source)
+            if known is not None and known[0] == mtime and not template_changed:
+                continue
+            url = page_url(source, self.content_dir)
+            self.sources[source] = (mtime, url)
+            self._render(source, url)
+            rebuilt.append(url)
+        removed = [self.sources.pop(source)[1] for source in set(self.sources) - seen]
+        with self.lock:
+            for url in removed:
+                self.pages.pop(url, None)
+
+        static_mtimes = {
+            path: os.stat(path).st_mtime_ns for path in iter_sources(self.static_dir)
+        }
+        static_changed = static_mtimes != self.static_mtimes
+        self.static_mtimes = static_mtimes
+
+        if rebuilt or removed or static_changed:
+            with self.changed:
+                self.version += 1
+                self.changed.notify_all()
+        return rebuilt, removed, static_changed
+
+    def _render(self, source, url):
+        stream = io.StringIO()
+        try:
+            render_page(source, self.template, self.basepath, stream)
+            page = stream.getvalue()
+        except Exception as error:
+            page = (
+                f"<html><body><h1>Error rendering {html.escape(source)}</h1>"
+                f"<pre>{html.escape(repr(error))}</pre></body></html>"
+            )
+        if self.live_reload:
+            index = page.rfind("</body>")
+            if index == -1:
+                page += LIVERELOAD_SCRIPT
+            else:
+                page = page[:index] + LIVERELOAD_SCRIPT + page[index:]
+        with self.lock:
+            self.pages[url] = page.encode()
+
+    def lookup(self, path):
+        if path.startswith(self.basepath):
+            path = "/" + path[len(self.basepath) :]
+        if path.endswith("/"):
+            path += "index.html"
+        with self.lock:
+            page = self.pages.get(path)
+            if page is None:
+                page = self.pages.get(path + "/index.html")
+        if page is not None:
+            return page, "text/html; charset=utf-8"
+
+        static_root = os.path.abspath(self.static_dir)
+        static_path = os.path.abspath(os.path.join(static_root, path.lstrip("/")))
+        if not static_path.startswith(static_root + os.sep):
+            return None, None
+        if not os.path.isfile(static_path):
+            return None, None
+        with open(static_path, "rb") as file:
+            body = file.read()
+        return body, mimetypes.guess_type(static_path)[0] or "application/octet-stream"
+
+    def wait_for_change(self, version, timeout):
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def watch(self, interval, stop):
+        while not stop.wait(interval):
+            start = time.perf_counter()
+            try:
+                rebuilt, removed, static_changed = self.refresh()
+            except Exception as error:
+                print(f"Watch error: {error!r}")
+                continue
+            if rebuilt or removed or static_changed:
+                elapsed = (time.perf_counter() - start) * 1000
+                print(
+                    f"Rebuilt {len(rebuilt)} page(s), removed {len(removed)}"
+                    f"{', static files changed' if static_changed else ''} in {elapsed:.1f} ms"
+                )
+
+
+def make_handler(site):
+    class DevRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = unquote(urlsplit(self.path).path)
+            if path == LIVERELOAD_PATH:
+                self.send_events()
+                return
+            self.send_body(path, head_only=False)
+
+        def do_HEAD(self):
+            self.send_body(unquote(urlsplit(self.path).path), head_only=True)
+
+        def send_body(self, path, head_only):
+            body, content_type = site.lookup(path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            if not head_only:
+                self.wfile.write(body)
+
+        def send_events(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            version = site.version
+            try:
+                while True:
+                    current = site.wait_for_change(version, 15)
+                    if current == version:
+                        self.wfile.write(b": ping\n\n")
+                    else:
+                        self.wfile.write(b"data: reload\n\n")
+                        version = current
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+        def log_message(self, format, *args):
+            pass
+
+    return DevRequestHandler
+
+
+def serve(
+    content_dir, static_dir, template_path, host, port, basepath="/", watch=False, interval=0.25
+):
+    site = DevSite(content_dir, static_dir, template_path, basepath, live_reload=watch)
+    start = time.perf_counter()
+    site.refresh()
+    print(f"Rendered {len(site.pages)} page(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    stop = threading.Event()
+    if watch:
+        threading.Thread(target=site.watch, args=(interval, stop), daemon=True).start()
+    server = ThreadingHTTPServer((host, port), make_handler(site))
+    server.daemon_threads = True
+    print(f"Serving on http://{host or 'localhost'}:{port}{basepath}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
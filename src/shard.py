@@ -0,0 +1,149 @@
+import argparse
+import heapq
+import os
+
+from src.dirs import with_parent_dirs
+from src.manifest import Manifest
+from src.output import is_unchanged
+from src.static_sync import copy_file
+
+PARTIAL_MANIFEST = "manifest.json"
+SITE_DIR = "site"
+
+
+def parse_shard(text):
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected K/N, got {text!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {text} is out of range")
+    return index, count
+
+
+def assign_shards(pages, count):
+    # Largest sources first, each to the currently lightest shard. Ties are
+    # broken by path and shard number, so every host computes the same split.
+    sized = sorted(
+        ((os.path.getsize(source), source, dest) for source, dest in pages),
+        key=lambda item: (-item[0], item[1]),
+    )
+    loads = [(0, index) for index in range(count)]
+    shards = [[] for _ in range(count)]
+    for size, source, dest in sized:
+        load, index = heapq.heappop(loads)
+        shards[index].append((source, dest))
+        heapq.heappush(loads, (load + size, index))
+    return [sorted(shard) for shard in shards]
+
+
+def select_shard(pages, index, count):
+    return assign_shards(pages, count)[index - 1]
+
+
+def shard_directory(root, index):
+    return os.path.join(root, str(index))
+
+
+def load_partial_manifest(shard_dir):
+    # Partial manifests store output paths relative to the shard's site
+    # directory, so a shard can be moved between hosts before merging.
+    # Static entries only carry fingerprints between shard builds.
+    partial = Manifest.load(os.path.join(shard_dir, PARTIAL_MANIFEST))
+    site = os.path.join(shard_dir, SITE_DIR)
+    pages = {os.path.join(site, relative): entry for relative, entry in partial.pages.items()}
+    static = {os.path.join(site, relative): entry for relative, entry in partial.static.items()}
+    return Manifest(partial.path, pages, static, shard=partial.shard)
+
+
+def save_partial_manifest(
+    manifest, shard_dir, index, count, basepath, template_hash, assets_hash=None
+):
+    site = os.path.join(shard_dir, SITE_DIR)
+    pages = {
+        os.path.relpath(dest, site).replace(os.sep, "/"): entry
+        for dest, entry in manifest.pages.items()
+    }
+    static = {
+        os.path.relpath(dest, site).replace(os.sep, "/"): entry
+        for dest, entry in manifest.static.items()
+    }
+    shard = {
+        "index": index,
+        "count": count,
+        "basepath": basepath,
+        "template_hash": template_hash,
+        "assets_hash": assets_hash,
+    }
+    Manifest(manifest.path, pages, static, shard=shard).save()
+
+
+def _load_shards(shard_dirs):
+    shards = {}
+    for shard_dir in shard_dirs:
+        partial = Manifest.load(os.path.join(shard_dir, PARTIAL_MANIFEST))
+        if partial.shard is None:
+            raise ValueError(f"{shard_dir} does not contain a shard manifest")
+        index = partial.shard["index"]
+        if index in shards:
+            raise ValueError(f"Shard {index} is given twice: {shards[index][0]} and {shard_dir}")
+        shards[index] = (shard_dir, partial)
+
+    for key in ("count", "basepath", "template_hash", "assets_hash"):
+        values = {partial.shard.get(key) for _, partial in shards.values()}
+        if len(values) > 1:
+            raise ValueError(f"Shards were built with different {key} values: {sorted(values)}")
+    count = next(iter(shards.values()))[1].shard["count"] if shards else 0
+    missing = sorted(set(range(1, count + 1)) - set(shards))
+    if not shards or missing:
+        raise ValueError(f"Missing shard(s): {', '.join(map(str, missing)) or 'all'}")
+    return shards
+
+
+def merge_shards(
+    shard_dirs, destination, manifest, link_mode="copy", changed=None, assets_hash=None
+):
+    shards = _load_shards(shard_dirs)
+    shard_assets = next(iter(shards.values()))[1].shard.get("assets_hash")
+    if shard_assets != assets_hash:
+        raise ValueError("Shards were rendered against different fingerprinted static files")
+
+    owners = {}
+    for index in sorted(shards):
+        shard_dir, partial = shards[index]
+        for relative in partial.pages:
+            if relative in owners:
+                raise ValueError(f"{relative} was built by shards {owners[relative]} and {index}")
+            if not os.path.isfile(os.path.join(shard_dir, SITE_DIR, relative)):
+                raise ValueError(f"Shard {index} is missing its output {relative}")
+            owners[relative] = index
+
+    merged = []
+    copied = []
+    for relative in sorted(owners):
+        shard_dir, partial = shards[owners[relative]]
+        entry = partial.pages[relative]
+        dest_path = os.path.join(destination, *relative.split("/"))
+        output_hash = entry.get("output_hash")
+        # Pages whose recorded output matches what docs/ already holds are
+        # left alone, so their mtimes survive the merge.
+        if output_hash is None or not is_unchanged(
+            dest_path, output_hash, manifest.output_hash(dest_path)
+        ):
+            source_path = os.path.join(shard_dir, SITE_DIR, relative)
+            with_parent_dirs(dest_path, copy_file, source_path, dest_path, link_mode)
+            copied.append(dest_path)
+        manifest.pages[dest_path] = entry
+        merged.append(dest_path)
+
+    removed = manifest.prune(merged, destination)
+    for dest_path in removed:
+        print(f"Removed stale page {dest_path}")
+    if changed is not None:
+        changed.extend(copied)
+        changed.extend(removed)
+    print(
+        f"Merged {len(merged)} page(s) from {len(shards)} shard(s), {len(copied)} copied,"
+        f" {len(removed)} removed"
+    )
+    return len(merged), len(removed)
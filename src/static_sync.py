@@ -0,0 +1,146 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from src.assets import file_fingerprint, fingerprint_path
+from src.dirs import remove_empty_dirs
+from src.manifest import hash_file
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+
+# ioctl request number for FICLONE on Linux (_IOW(0x94, 9, int)).
+_FICLONE = 0x40049409
+
+
+def iter_files(root, destination):
+    for directory, _, names in os.walk(root):
+        relative = os.path.relpath(directory, root)
+        dest_directory = destination if relative == "." else os.path.join(destination, relative)
+        if names:
+            os.makedirs(dest_directory, exist_ok=True)
+        for name in names:
+            yield os.path.join(directory, name), os.path.join(dest_directory, name)
+
+
+def needs_copy(source_path, dest_path, use_hash):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return True
+    source_stat = os.stat(source_path)
+    if dest_stat.st_size != source_stat.st_size:
+        return True
+    if dest_stat.st_mtime_ns == source_stat.st_mtime_ns:
+        return False
+    if use_hash and hash_file(source_path) == hash_file(dest_path):
+        # Same bytes with a different mtime: fix up the mtime so the next
+        # build can skip the file on size and mtime alone.
+        shutil.copystat(source_path, dest_path)
+        return False
+    return True
+
+
+def copy_file(source_path, dest_path, link_mode="copy"):
+    tmp_path = f"{dest_path}.tmp{os.getpid()}"
+    try:
+        if link_mode == "hardlink":
+            try:
+                os.link(source_path, tmp_path)
+            except OSError:
+                shutil.copy2(source_path, tmp_path)
+        elif link_mode == "reflink":
+            try:
+                _reflink(source_path, tmp_path)
+                shutil.copystat(source_path, tmp_path)
+            except OSError:
+                shutil.copy2(source_path, tmp_path)
+        else:
+            shutil.copy2(source_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def sync_file(source_path, dest_path, use_hash, link_mode, fingerprint=False, cached=None):
+    entry = {"source": source_path}
+    if fingerprint:
+        entry = file_fingerprint(source_path, cached)
+        dest_path = fingerprint_path(dest_path, entry["hash"])
+        # The name carries the content hash, so a file of the same size
+        # under that name already holds these bytes.
+        if os.path.isfile(dest_path) and os.path.getsize(dest_path) == entry["size"]:
+            return dest_path, entry, False
+    if not needs_copy(source_path, dest_path, use_hash):
+        return dest_path, entry, False
+    copy_file(source_path, dest_path, link_mode)
+    return dest_path, entry, True
+
+
+def _reflink(source_path, dest_path):
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    with open(source_path, "rb") as source, open(dest_path, "wb") as dest:
+        try:
+            fcntl.ioctl(dest.fileno(), _FICLONE, source.fileno())
+        except OSError:
+            dest.close()
+            os.remove(dest_path)
+            raise
+
+
+def sync_directory(
+    source,
+    destination,
+    manifest,
+    use_hash=False,
+    link_mode="copy",
+    jobs=8,
+    changed=None,
+    fingerprint=False,
+):
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode: {link_mode}")
+
+    cached = {entry.get("source"): entry for entry in manifest.static.values()}
+    synced = {}
+    copied = []
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(
+                sync_file,
+                source_path,
+                dest_path,
+                use_hash,
+                link_mode,
+                fingerprint,
+                cached.get(source_path),
+            )
+            for source_path, dest_path in iter_files(source, destination)
+        ]
+        for future in futures:
+            dest_path, entry, was_copied = future.result()
+            synced[dest_path] = entry
+            if was_copied:
+                copied.append(dest_path)
+
+    removed = []
+    for dest_path in sorted(set(manifest.static) - set(synced)):
+        if os.path.isfile(dest_path):
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), destination)
+            removed.append(dest_path)
+    manifest.static = synced
+    if changed is not None:
+        changed.extend(copied)
+        changed.extend(removed)
+
+    skipped = len(synced) - len(copied)
+    print(f"Static files: {len(copied)} copied, {skipped} skipped, {len(removed)} removed")
+    return len(copied), skipped, len(removed)
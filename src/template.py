@@ -0,0 +1,100 @@
+import os
+import re
+
+from src.manifest import hash_bytes, hash_file
+
+_TOKEN_PATTERN = re.compile(
+    r'\{\{ include "(?P<include>[^"]+)" \}\}'
+    r"|\{\{ (?P<slot>\w+) \}\}"
+    r'|(?P<attr>href|src)="(?P<url>/[^"]*)'
+)
+
+_cache = {}
+
+
+class Template:
+    def __init__(self, path, segments, dependencies):
+        self.path = path
+        self.segments = segments
+        self.dependencies = dependencies
+
+    def is_current(self):
+        for path, mtime in self.dependencies.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def content_hash(self):
+        hashes = [hash_file(path) for path in sorted(self.dependencies)]
+        return hash_bytes("\n".join(hashes).encode())
+
+    def iter_render(self, values, resolve_url=None):
+        for segment in self.segments:
+            if isinstance(segment, str):
+                yield segment
+                continue
+            kind, name, arg = segment
+            if kind == "url":
+                yield f'{name}="{resolve_url(arg) if resolve_url else arg}'
+            elif name not in values:
+                yield arg
+            elif isinstance(values[name], str):
+                yield values[name]
+            else:
+                yield from values[name]
+
+    def render(self, values, resolve_url=None):
+        return "".join(self.iter_render(values, resolve_url))
+
+    def write(self, stream, values, resolve_url=None):
+        stream.writelines(self.iter_render(values, resolve_url))
+
+
+def compile_template(path, _stack=()):
+    path = os.path.abspath(path)
+    if path in _stack:
+        raise ValueError(f"Template include cycle: {' -> '.join(_stack + (path,))}")
+    with open(path, "r") as file:
+        source = file.read()
+    dependencies = {path: os.stat(path).st_mtime_ns}
+
+    segments = []
+    position = 0
+    for match in _TOKEN_PATTERN.finditer(source):
+        segments.append(source[position : match.start()])
+        position = match.end()
+        if match["include"] is not None:
+            partial_path = os.path.join(os.path.dirname(path), match["include"])
+            partial = load_template(partial_path, _stack + (path,))
+            segments.extend(partial.segments)
+            dependencies.update(partial.dependencies)
+        elif match["slot"] is not None:
+            segments.append(("slot", match["slot"], match.group(0)))
+        else:
+            segments.append(("url", match["attr"], match["url"]))
+    segments.append(source[position:])
+    return Template(path, _merge_literals(segments), dependencies)
+
+
+def load_template(path, _stack=()):
+    path = os.path.abspath(path)
+    template = _cache.get(path)
+    if template is None or not template.is_current():
+        template = compile_template(path, _stack)
+        _cache[path] = template
+    return template
+
+
+def _merge_literals(segments):
+    merged = []
+    for segment in segments:
+        if segment == "":
+            continue
+        if isinstance(segment, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += segment
+        else:
+            merged.append(segment)
+    return merged
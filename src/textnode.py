@@ -10,6 +10,8 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -25,7 +27,7 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
-def text_node_to_html(text_node):
+def text_node_to_html(text_node, resolve_url=None):
     match text_node.text_type:
         case TextType.TEXT:
             return LeafNode(None, text_node.text)
@@ -36,8 +38,29 @@ def text_node_to_html(text_node):
         case TextType.CODE:
             return LeafNode("code", text_node.text)
         case TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
+            url = resolve_url(text_node.url) if resolve_url else text_node.url
+            return LeafNode("a", text_node.text, {"href": url})
         case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            url = resolve_url(text_node.url) if resolve_url else text_node.url
+            return LeafNode("img", "", {"src": url, "alt": text_node.text})
         case _:
             raise ValueError(f"Invalid text type: {text_node.text_type}")
+
+_INLINE_TAGS = {TextType.BOLD: "b", TextType.ITALIC: "i", TextType.CODE: "code"}
+
+def text_node_to_html_string(text_node, resolve_url=None):
+    # The HTML text_node_to_html(text_node).to_html() produces, without
+    # creating the LeafNode.
+    text_type = text_node.text_type
+    if text_type == TextType.TEXT:
+        return text_node.text
+    tag = _INLINE_TAGS.get(text_type)
+    if tag is not None:
+        return f"<{tag}>{text_node.text}</{tag}>"
+    if text_type == TextType.LINK:
+        url = resolve_url(text_node.url) if resolve_url else text_node.url
+        return f'<a href="{url}">{text_node.text}</a>'
+    if text_type == TextType.IMAGE:
+        url = resolve_url(text_node.url) if resolve_url else text_node.url
+        return f'<img src="{url}" alt="{text_node.text}"></img>'
+    raise ValueError(f"Invalid text type: {text_type}")
@@ -0,0 +1,62 @@
+import re
+
+from src.assets import hash_assets
+
+# Targets of markdown links and images that are root-relative, the only
+# URLs the resolver rewrites.
+_ROOT_TARGET = re.compile(r"\]\((/[^()]*)\)")
+
+
+class UrlResolver:
+    __slots__ = ("basepath", "assets", "_cache_key")
+
+    def __init__(self, basepath="/", assets=None):
+        self.basepath = basepath
+        self.assets = assets or None
+        assets_hash = hash_assets(self.assets)
+        self._cache_key = basepath if assets_hash is None else f"{basepath}\0{assets_hash}"
+
+    def __call__(self, url):
+        # Root-relative URLs are served from under the basepath; absolute,
+        # protocol-relative and relative URLs are left alone. Paths with a
+        # fingerprinted asset are swapped for it, keeping query and fragment.
+        if url.startswith("/") and not url.startswith("//"):
+            if self.assets is not None:
+                end = _path_end(url)
+                asset = self.assets.get(url[:end])
+                if asset is not None:
+                    url = asset + url[end:]
+            return self.basepath + url[1:]
+        return url
+
+    def cache_key(self):
+        return self._cache_key
+
+    def block_key(self, text):
+        # The part of the resolver a block of markdown depends on: the
+        # basepath, plus the fingerprints of just the assets its link and
+        # image targets name, so editing one asset leaves other blocks cached.
+        if self.assets is None or "](/" not in text:
+            return self.basepath
+        pairs = set()
+        for url in _ROOT_TARGET.findall(text):
+            path = url[:_path_end(url)]
+            asset = self.assets.get(path)
+            if asset is not None:
+                pairs.add(f"{path}={asset}")
+        return "\0".join([self.basepath, *sorted(pairs)])
+
+    def __eq__(self, other):
+        return isinstance(other, UrlResolver) and self.cache_key() == other.cache_key()
+
+    def __hash__(self):
+        return hash(self.cache_key())
+
+
+def _path_end(url):
+    end = len(url)
+    for mark in "?#":
+        index = url.find(mark)
+        if index != -1 and index < end:
+            end = index
+    return end
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src.main import generate_site
+from src.manifest import Manifest
+
+
+class TempDirTestCase(unittest.TestCase):
+    # A fresh temporary directory per test, removed afterwards.
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+
+    def write(self, path, text, mtime=None):
+        # mtime is in nanoseconds, for tests that depend on it.
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(text)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+        return path
+
+    def read(self, path):
+        with open(path) as file:
+            return file.read()
+
+    def read_bytes(self, path):
+        with open(path, "rb") as file:
+            return file.read()
+
+    def read_tree(self, root):
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                files[os.path.relpath(path, root)] = self.read_bytes(path)
+        return files
+
+
+class SiteTestCase(TempDirTestCase):
+    # A site with content/blog, a template and an empty manifest, built
+    # into docs/ by build_site.
+    template_text = "<title>{{ Title }}</title>{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write(self.template, self.template_text)
+        self.manifest = Manifest(os.path.join(self.root, "manifest.json"))
+
+    def build_site(self, dest=None, basepath="/", manifest=None, **options):
+        with redirect_stdout(StringIO()):
+            return generate_site(
+                self.content,
+                self.template,
+                self.dest if dest is None else dest,
+                basepath,
+                self.manifest if manifest is None else manifest,
+                **options,
+            )
@@ -0,0 +1,91 @@
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src.assets import (
+    ASSET_MANIFEST,
+    asset_map,
+    file_fingerprint,
+    fingerprint_path,
+    fingerprint_tree,
+    write_asset_manifest,
+)
+from src.manifest import hash_bytes
+from src.static_sync import sync_directory
+from src.urls import UrlResolver
+from tests.helpers import SiteTestCase
+
+
+class TestAssets(SiteTestCase):
+    template_text = '<link href="/index.css">{{ Content }}'
+
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def sync(self):
+        with redirect_stdout(StringIO()):
+            sync_directory(self.static, self.dest, self.manifest, fingerprint=True)
+        return asset_map(self.manifest.static, self.static, self.dest)
+
+    def test_fingerprint_path(self):
+        # The short content hash goes before the extension.
+        self.assertEqual(fingerprint_path("a/index.css", "3f2a9c1e99"), "a/index.3f2a9c1e.css")
+        self.assertEqual(fingerprint_path("LICENSE", "3f2a9c1e99"), "LICENSE.3f2a9c1e")
+
+    def test_hash_cached_by_size_and_mtime(self):
+        # A file with the recorded size and mtime is not hashed again.
+        path = os.path.join(self.static, "index.css")
+        entry = file_fingerprint(path)
+        self.assertEqual(entry["hash"], hash_bytes(b"body {}"))
+        self.assertEqual(file_fingerprint(path, dict(entry, hash="cached"))["hash"], "cached")
+        stale = dict(entry, hash="cached", mtime=entry["mtime"] - 1)
+        self.assertEqual(file_fingerprint(path, stale)["hash"], entry["hash"])
+
+    def test_sync_copies_to_fingerprinted_names(self):
+        # Static files land under hashed names and the map points at them.
+        css = "/index." + hash_bytes(b"body {}")[:8] + ".css"
+        assets = self.sync()
+        self.assertEqual(assets["/index.css"], css)
+        self.assertTrue(os.path.isfile(os.path.join(self.dest, css[1:])))
+        self.assertEqual(
+            assets, asset_map(fingerprint_tree(self.static, self.dest), self.static, self.dest)
+        )
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        changed = self.sync()
+        self.assertNotEqual(changed["/index.css"], css)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, css[1:])))
+
+    def test_asset_manifest_written_and_removed(self):
+        # The asset manifest mirrors the map and goes away when disabled.
+        assets = self.sync()
+        write_asset_manifest(self.dest, assets)
+        self.assertEqual(json.loads(self.read(os.path.join(self.dest, ASSET_MANIFEST))), assets)
+        write_asset_manifest(self.dest, None)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, ASSET_MANIFEST)))
+
+    def test_resolver_rewrites_asset_urls(self):
+        # Asset paths are swapped, keeping query strings and fragments.
+        resolve_url = UrlResolver("/base/", {"/index.css": "/index.abc.css"})
+        self.assertEqual(resolve_url("/index.css?v=1#x"), "/base/index.abc.css?v=1#x")
+        self.assertEqual(resolve_url("/other.css"), "/base/other.css")
+        self.assertNotEqual(resolve_url.cache_key(), UrlResolver("/base/").cache_key())
+
+    def test_pages_rebuilt_when_assets_change(self):
+        # Pages render fingerprinted URLs and rebuild when an asset changes.
+        self.write(os.path.join(self.content, "index.md"), "# Hi\n\n![a](/images/a.png)")
+        for css, rebuilt in (("body {}", 1), ("body {}", 0), ("p {}", 1)):
+            self.write(os.path.join(self.static, "index.css"), css)
+            assets = self.sync()
+            self.assertEqual(self.build_site(assets=assets)[0], rebuilt)
+        html = self.read(os.path.join(self.dest, "index.html"))
+        self.assertIn(assets["/index.css"], html)
+        self.assertIn(assets["/images/a.png"], html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import pickle
+import unittest
+
+from src.block_cache import BlockCache, open_block_cache
+from src.markdown_html import markdown_to_html_node
+from tests.helpers import TempDirTestCase
+
+
+class TestBlockCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "blocks.sqlite")
+
+    def test_get_put_counts_hits_and_misses(self):
+        # Lookups are counted as hits or misses.
+        cache = BlockCache(self.path)
+        key = cache.key("Some **text**")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "<p>Some <b>text</b></p>")
+        self.assertEqual(cache.get(key), "<p>Some <b>text</b></p>")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1})
+        cache.close()
+
+    def test_persists_between_instances(self):
+        # Flushed blocks are visible to a new connection.
+        cache = BlockCache(self.path)
+        cache.put(cache.key("a"), "<p>a</p>")
+        cache.close()
+        other = BlockCache(self.path)
+        self.assertEqual(other.get(other.key("a")), "<p>a</p>")
+        other.close()
+
+    def test_evict_least_recently_used(self):
+        # Eviction drops the least recently used blocks first.
+        cache = BlockCache(self.path, max_bytes=25)
+        for name in ("one", "two", "three"):
+            cache.put(cache.key(name), name * 3)
+            cache.flush()
+        cache.get(cache.key("one"))
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNotNone(cache.get(cache.key("one")))
+        self.assertIsNone(cache.get(cache.key("two")))
+        self.assertIsNotNone(cache.get(cache.key("three")))
+        cache.close()
+
+    def test_pickle_reuses_process_instance(self):
+        # Unpickling in the same process yields the shared instance.
+        cache = open_block_cache(self.path)
+        self.assertIs(pickle.loads(pickle.dumps(cache)), cache)
+        cache.close()
+
+    def test_cached_render_matches_uncached(self):
+        # Rendering through the cache gives the same HTML, hot or cold.
+        md = "# Title\n\nA [link](/x) and `code`\n\n- one\n- two"
+        expected = markdown_to_html_node(md).to_html()
+        cache = BlockCache(self.path)
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), expected)
+        self.assertEqual(cache.stats(), {"hits": 3, "misses": 3})
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import random
+import unittest
+
+from bench.corpus import generate_markdown, parse_mix
+from src.page import extract_title
+from src.markdown_html import markdown_to_html_node
+
+
+class TestCorpus(unittest.TestCase):
+    def test_generate_markdown_is_reproducible(self):
+        # The same seed always yields the same document.
+        mix = parse_mix(None)
+        first = generate_markdown(random.Random(3), 30, mix)
+        second = generate_markdown(random.Random(3), 30, mix)
+        self.assertEqual(first, second)
+
+    def test_generated_markdown_renders(self):
+        # Every feature mix produces pages the generator can render.
+        for mix_text in (None, "code=0,lists=0", "links=5,images=5,emphasis=0"):
+            with self.subTest(mix=mix_text):
+                markdown = generate_markdown(random.Random(1), 60, parse_mix(mix_text))
+                self.assertTrue(extract_title(markdown))
+                self.assertTrue(markdown_to_html_node(markdown).to_html())
+
+    def test_parse_mix_rejects_unknown_feature(self):
+        # Unknown feature names are rejected.
+        with self.assertRaises(ValueError):
+            parse_mix("tables=1")
+
+
+if __name__ == "__main__":
+    unittest.main()
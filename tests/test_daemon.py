@@ -0,0 +1,97 @@
+import os
+import sys
+import threading
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+
+from src import client, pools
+from src.daemon import BuildServer, _is_listening, serve_builds
+from tests.helpers import TempDirTestCase
+
+
+def fake_build(argv):
+    if argv == ["fail"]:
+        raise RuntimeError("broken page")
+    if argv == ["exit"]:
+        sys.exit(3)
+    print("built", *argv)
+    print("warning", file=sys.stderr)
+
+
+class TestDaemon(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "daemon.sock")
+
+    def start(self):
+        # Serves on a background thread until a stop request arrives.
+        with redirect_stdout(StringIO()):
+            thread = threading.Thread(target=serve_builds, args=(fake_build, self.path))
+            thread.start()
+            while thread.is_alive() and not _is_listening(self.path):
+                thread.join(0.01)
+        self.assertTrue(thread.is_alive())
+        return thread
+
+    def request(self, argv, cwd=None):
+        return client.request({"argv": argv, "cwd": cwd or os.getcwd()}, self.path)
+
+    def test_build_output_and_status(self):
+        # Output and the exit status of each build are sent back.
+        server = BuildServer(self.path, fake_build)
+        try:
+            response = server.respond({"argv": ["/base/"], "cwd": os.getcwd()})
+            self.assertEqual(
+                response, {"status": 0, "stdout": "built /base/\n", "stderr": "warning\n"}
+            )
+            self.assertEqual(server.respond({"argv": ["exit"], "cwd": os.getcwd()})["status"], 3)
+            failed = server.respond({"argv": ["fail"], "cwd": os.getcwd()})
+            self.assertEqual(failed["status"], 1)
+            self.assertIn("RuntimeError: broken page", failed["stderr"])
+        finally:
+            server.server_close()
+
+    def test_rejects_other_directories_and_subcommands(self):
+        # Builds for another directory and blocking subcommands are refused.
+        server = BuildServer(self.path, fake_build)
+        try:
+            other = server.respond({"argv": [], "cwd": self.root})
+            self.assertEqual(other["status"], 2)
+            serve = server.respond({"argv": ["serve"], "cwd": os.getcwd()})
+            self.assertEqual(serve["status"], 2)
+        finally:
+            server.server_close()
+
+    def test_requests_over_socket(self):
+        # Builds run one after another until the daemon is stopped.
+        thread = self.start()
+        self.assertEqual(self.request(["one"])["stdout"], "built one\n")
+        self.assertEqual(self.request(["two"])["stdout"], "built two\n")
+        self.assertEqual(client.request({"stop": True}, self.path)["status"], 0)
+        thread.join()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertIsNone(pools._resident)
+
+    def test_refuses_second_daemon(self):
+        # A live socket is not taken over; a stale one is replaced.
+        thread = self.start()
+        with self.assertRaises(SystemExit):
+            serve_builds(fake_build, self.path)
+        client.request({"stop": True}, self.path)
+        thread.join()
+        open(self.path, "w").close()
+        thread = self.start()
+        self.assertEqual(self.request(["again"])["status"], 0)
+        client.request({"stop": True}, self.path)
+        thread.join()
+
+    def test_client_stop_without_daemon(self):
+        # Stopping reports an error when no daemon is listening.
+        with redirect_stderr(StringIO()) as stderr:
+            self.assertEqual(client.main(["--stop"]), 1)
+        self.assertIn("No build daemon", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import shutil
+import unittest
+
+from src import dirs
+from src.dirs import make_parent_dirs, remove_empty_dirs, with_parent_dirs
+from tests.helpers import TempDirTestCase
+
+
+class TestDirs(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "blog", "2024", "post.html")
+
+    def test_created_directories_are_remembered(self):
+        # A created directory is recorded and not created again.
+        make_parent_dirs(self.path)
+        self.assertIn(os.path.dirname(self.path), dirs._created_dirs)
+        os.rmdir(os.path.dirname(self.path))
+        make_parent_dirs(self.path)
+        self.assertFalse(os.path.exists(os.path.dirname(self.path)))
+
+    def test_removed_directories_are_forgotten(self):
+        # Directories deleted as empty are created again on the next use.
+        make_parent_dirs(self.path)
+        remove_empty_dirs(os.path.dirname(self.path), self.root)
+        self.assertEqual(os.listdir(self.root), [])
+        make_parent_dirs(self.path)
+        self.assertTrue(os.path.isdir(os.path.dirname(self.path)))
+
+    def test_with_parent_dirs_recreates_removed_directories(self):
+        # A remembered directory deleted by someone else is made again.
+        make_parent_dirs(self.path)
+        os.rmdir(os.path.dirname(self.path))
+        source = os.path.join(self.root, "page.html")
+        self.write(source, "page")
+        with_parent_dirs(self.path, shutil.copyfile, source, self.path)
+        self.assertEqual(self.read(self.path), "page")
+
+    def test_remove_stops_at_root_and_non_empty(self):
+        # Only empty directories below the root are removed.
+        make_parent_dirs(self.path)
+        self.write(os.path.join(self.root, "blog", "index.html"), "")
+        remove_empty_dirs(os.path.dirname(self.path), self.root)
+        self.assertEqual(os.listdir(os.path.join(self.root, "blog")), ["index.html"])
+        self.assertTrue(os.path.isdir(self.root))
+
+
+if __name__ == "__main__":
+    unittest.main()
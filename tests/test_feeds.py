@@ -0,0 +1,98 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src.feeds import FEED, SITEMAP, is_post, render_summary, write_feeds
+from src.urls import UrlResolver
+from tests.helpers import SiteTestCase
+
+
+class TestFeeds(SiteTestCase):
+    template_text = "{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Fan Club\n\nHome")
+        self.write(
+            os.path.join(self.content, "blog", "first", "index.md"),
+            "---\ndate: 2024-01-05\n---\n# First & best\n\n[Back](/)\n\nSome **text**",
+        )
+
+    def read_output(self, name):
+        return self.read(os.path.join(self.dest, name))
+
+    def build(self, site_url="https://example.org/"):
+        self.build_site(basepath="/site/")
+        with redirect_stdout(StringIO()):
+            written = write_feeds(self.manifest, self.content, self.dest, site_url, "/site/")
+        return {os.path.basename(path) for path in written}
+
+    def test_is_post(self):
+        # Posts live below content/blog; its own index is a listing page.
+        self.assertTrue(is_post("./content/blog/tom/index.md", "content"))
+        self.assertFalse(is_post("content/blog/index.md", "content"))
+        self.assertFalse(is_post("content/blogroll.md", "content"))
+
+    def test_summary_skips_link_only_paragraphs(self):
+        # The summary is the first paragraph with text of its own.
+        source = os.path.join(self.content, "blog", "first", "index.md")
+        html = render_summary(source, UrlResolver("/site/"))
+        self.assertEqual(html, "<p>Some <b>text</b></p>")
+
+    def test_writes_sitemap_and_feed(self):
+        # Both files use absolute URLs and escape their content.
+        self.assertEqual(self.build(), {SITEMAP, FEED})
+        sitemap = self.read_output(SITEMAP)
+        self.assertIn("<loc>https://example.org/site/</loc>", sitemap)
+        self.assertIn(
+            "<loc>https://example.org/site/blog/first/</loc><lastmod>2024-01-05</lastmod>",
+            sitemap,
+        )
+        feed = self.read_output(FEED)
+        self.assertIn("<title>Fan Club</title>", feed)
+        self.assertIn("<title>First &amp; best</title>", feed)
+        self.assertIn("<pubDate>Fri, 05 Jan 2024 00:00:00 +0000</pubDate>", feed)
+        self.assertIn("<description>&lt;p&gt;Some &lt;b&gt;text&lt;/b&gt;&lt;/p&gt;", feed)
+
+    def test_unchanged_build_writes_nothing(self):
+        # A rebuild of an unchanged site leaves both files alone.
+        self.build()
+        self.assertEqual(self.build(), set())
+
+    def test_new_post_uses_cached_summaries(self):
+        # Adding a post renders only its own summary.
+        self.build()
+        cached = self.manifest.summaries[os.path.join(self.dest, "blog", "first", "index.html")]
+        cached["html"] = "<p>cached</p>"
+        self.write(
+            os.path.join(self.content, "blog", "second", "index.md"),
+            "---\ndate: 2024-02-01\n---\n# Second\n\nNewer",
+        )
+        self.assertEqual(self.build(), {SITEMAP, FEED})
+        feed = self.read_output(FEED)
+        self.assertIn("&lt;p&gt;cached&lt;/p&gt;", feed)
+        self.assertLess(feed.index("<title>Second</title>"), feed.index("<title>First"))
+
+    def test_summary_links_are_absolute(self):
+        # Root-relative links in a summary point at the site; a new site URL
+        # renders the summary again.
+        self.write(
+            os.path.join(self.content, "blog", "first", "index.md"),
+            "# First\n\nSee [about](/about.html) and [elsewhere](https://a.example/)",
+        )
+        self.build()
+        self.assertIn('href="https://example.org/site/about.html"', self.read_output(FEED))
+        self.assertIn('href="https://a.example/"', self.read_output(FEED))
+        self.build("https://example.net")
+        self.assertIn('href="https://example.net/site/about.html"', self.read_output(FEED))
+
+    def test_invalid_date(self):
+        # Dates that are not ISO dates are rejected.
+        self.write(os.path.join(self.content, "index.md"), "---\ndate: soon\n---\n# Home")
+        with self.assertRaises(ValueError):
+            self.build()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import io
+import os
+import unittest
+
+from src.front_matter import parse_front_matter, split_front_matter
+from src.page import extract_title, render_markdown
+from src.template import load_template
+from tests.helpers import TempDirTestCase
+
+
+class TestFrontMatter(TempDirTestCase):
+    def test_split_front_matter(self):
+        # The header is parsed and the body starts after the closing fence.
+        lines = io.StringIO("---\ntitle: Post\n---\n# Heading\n\nBody\n")
+        metadata, body = split_front_matter(lines)
+        self.assertEqual(metadata, {"title": "Post"})
+        self.assertEqual(list(body), ["# Heading\n", "\n", "Body\n"])
+
+    def test_without_front_matter(self):
+        # Files without a leading fence are returned whole.
+        metadata, body = split_front_matter(io.StringIO("# Title\n---\n"))
+        self.assertEqual(metadata, {})
+        self.assertEqual(list(body), ["# Title\n", "---\n"])
+
+    def test_stops_reading_after_header(self):
+        # Lines after the closing fence are not consumed.
+        lines = iter(["---\n", "a: 1\n", "---\n", "body\n"])
+        split_front_matter(lines)
+        self.assertEqual(list(lines), ["body\n"])
+
+    def test_values(self):
+        # Scalars, quoted strings, inline lists and block lists are supported.
+        metadata = parse_front_matter(
+            [
+                "# a comment",
+                'title: "Colons: fine"',
+                "date: 2024-03-01",
+                "tags: [elves, 'rings']",
+                "authors:",
+                "  - Tom",
+                "  - Goldberry",
+                "draft:",
+                "",
+            ]
+        )
+        self.assertEqual(
+            metadata,
+            {
+                "title": "Colons: fine",
+                "date": "2024-03-01",
+                "tags": ["elves", "rings"],
+                "authors": ["Tom", "Goldberry"],
+                "draft": None,
+            },
+        )
+
+    def test_invalid_line(self):
+        # Lines that are neither keys nor list items are rejected.
+        with self.assertRaises(ValueError):
+            parse_front_matter(["title Post"])
+
+    def test_unclosed(self):
+        # A header without a closing fence is rejected.
+        with self.assertRaises(ValueError):
+            split_front_matter(["---\n", "title: Post\n"])
+
+    def test_title_from_front_matter(self):
+        # A front matter title takes precedence over the first h1.
+        self.assertEqual(extract_title("---\ntitle: Meta\n---\n# Heading\n"), "Meta")
+        self.assertEqual(extract_title("---\ndate: 2024-01-01\n---\n# Heading\n"), "Heading")
+
+    def test_render_skips_front_matter(self):
+        # The header is not rendered as part of the page.
+        stream = io.StringIO()
+        path = self.write(
+            os.path.join(self.root, "template.html"), "<title>{{ Title }}</title>{{ Content }}"
+        )
+        template = load_template(path)
+        render_markdown("---\ntitle: Meta\n---\n# Heading\n", template, "/", stream)
+        self.assertEqual(stream.getvalue(), "<title>Meta</title><div><h1>Heading</h1></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from src.htmlnode import HTMLNode, LeafNode, ParentNode
@@ -126,5 +127,60 @@ class testHTMLNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             parent_node.to_html()
 
+    def test_shared_empty_defaults(self):
+        # Nodes without children or props share immutable empty defaults.
+        first = LeafNode("b", "one")
+        second = LeafNode("i", "two")
+        self.assertIs(first.children, second.children)
+        self.assertIs(first.props, second.props)
+        with self.assertRaises(TypeError):
+            first.children.append(second)
+        with self.assertRaises(TypeError):
+            first.props["class"] = "x"
+
+    def test_nodes_have_no_instance_dict(self):
+        # Node classes are slotted.
+        self.assertFalse(hasattr(LeafNode("p", "text"), "__dict__"))
+        self.assertFalse(hasattr(ParentNode("p", [LeafNode("b", "x")]), "__dict__"))
+
+    def test_props_rendered_on_assignment(self):
+        # Reassigning props re-renders the attribute string.
+        node = LeafNode("a", "link", {"href": "/one"})
+        node.props = {"href": "/two"}
+        self.assertEqual(node.to_html(), '<a href="/two">link</a>')
+
+    def test_props_edited_before_rendering(self):
+        # Props edited in place before the first render are rendered.
+        node = LeafNode("a", "link", {"href": "/one"})
+        node.props["href"] = "/two"
+        self.assertEqual(node.to_html(), '<a href="/two">link</a>')
+        node.props = {"href": "/three"}
+        self.assertEqual(node.to_html(), '<a href="/three">link</a>')
+
+    def test_iter_html_fragments(self):
+        # iter_html yields fragments that join to to_html output.
+        parent_node = ParentNode(
+            "div", [LeafNode("b", "bold"), ParentNode("p", [LeafNode(None, "text")])]
+        )
+        fragments = list(parent_node.iter_html())
+        self.assertEqual(fragments, ["<div>", "<b>bold</b>", "<p>", "text", "</p>", "</div>"])
+        self.assertEqual("".join(fragments), parent_node.to_html())
+
+    def test_write_html_to_stream(self):
+        # write_html streams the same HTML into a text stream.
+        parent_node = ParentNode("div", [LeafNode("span", "child")], {"class": "x"})
+        stream = io.StringIO()
+        parent_node.write_html(stream)
+        self.assertEqual(stream.getvalue(), parent_node.to_html())
+
+    def test_to_html_deep_tree(self):
+        # Deep trees serialize without hitting the recursion limit.
+        node = LeafNode(None, "leaf")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * 5000 + "leaf"))
+        self.assertEqual(len(html), 5000 * len("<span></span>") + len("leaf"))
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,4 @@
+import random
 import unittest
 from src.inline_markdown import (
     split_nodes_delimiter,
@@ -6,6 +7,7 @@ from src.inline_markdown import (
     extract_markdown_images,
     extract_markdown_links,
     text_to_textnode,
+    text_to_textnode_reference,
 )
 from src.textnode import TextNode, TextType
 
@@ -270,6 +272,42 @@ class TestInlineMarkdown(unittest.TestCase):
         result = text_to_textnode("Text")
         self.assertIsInstance(result, list)
 
+    def assert_same_as_reference(self, text):
+        try:
+            expected = text_to_textnode_reference(text)
+        except ValueError as error:
+            with self.assertRaises(ValueError) as caught:
+                text_to_textnode(text)
+            self.assertEqual(str(caught.exception), str(error))
+            return
+        self.assertEqual(text_to_textnode(text), expected)
+
+    def test_text_to_textnode_matches_reference_examples(self):
+        # The single-pass scanner matches the staged pipeline on known inputs
+        examples = [
+            "",
+            "Text",
+            "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+            "**bold _not italic_ here**",
+            "a `**b**` c",
+            "x****y",
+            "!![a](b) [c](d)![e](f)",
+            "This has **bold",
+            "_a_ *b* **c",
+        ]
+        for text in examples:
+            with self.subTest(text=text):
+                self.assert_same_as_reference(text)
+
+    def test_text_to_textnode_matches_reference_fuzz(self):
+        # Random delimiter/link soups produce identical nodes or errors
+        pieces = ["a", " ", "*", "**", "_", "`", "!", "[", "]", "(", ")", "![a](b)", "[l](u)"]
+        rng = random.Random(5)
+        for _ in range(3000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 14)))
+            with self.subTest(text=text):
+                self.assert_same_as_reference(text)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,94 @@
+import os
+import unittest
+from unittest import mock
+
+from src.main import hash_file, iter_pages, parse_args
+from src.page import extract_title
+from src.manifest import Manifest
+from tests.helpers import SiteTestCase
+
+
+class TestMain(SiteTestCase):
+    template_text = '<a href="/">{{ Title }}</a>{{ Content }}'
+
+    def setUp(self):
+        super().setUp()
+        for i in range(6):
+            self.write(
+                os.path.join(self.content, "blog", f"post{i}.md"),
+                f"# Post {i}\n\nSee [home](/) and **bold** text {i}",
+            )
+
+    def build(self, dest, jobs):
+        manifest = Manifest(os.path.join(self.root, f"{jobs}.json"))
+        return self.build_site(dest, "/base/", manifest, jobs=jobs)
+
+    def test_extract_title(self):
+        # extract_title skips h2+ headings and returns the first h1.
+        self.assertEqual(extract_title("## Sub\n# Main title \n"), "Main title")
+
+    def test_extract_title_missing(self):
+        # extract_title raises when there is no h1.
+        with self.assertRaises(Exception):
+            extract_title("## Only a subheading")
+
+    def test_parse_args_defaults(self):
+        # The basepath stays an optional positional argument.
+        args = parse_args(["/Python-SSG/", "--jobs", "4"])
+        self.assertEqual((args.basepath, args.jobs), ("/Python-SSG/", 4))
+        self.assertEqual(parse_args([]).basepath, "/")
+
+    def test_parallel_build_matches_serial(self):
+        # A process pool build is byte-identical to the serial build.
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        self.assertEqual(self.build(serial, 1), (6, 0, 0))
+        self.assertEqual(self.build(parallel, 3), (6, 0, 0))
+        self.assertEqual(self.read_tree(serial), self.read_tree(parallel))
+
+    def test_parallel_build_reports_errors(self):
+        # Worker failures come back to the parent and fail the build.
+        self.write(os.path.join(self.content, "broken.md"), "no title here")
+        with self.assertRaises(RuntimeError):
+            self.build(os.path.join(self.root, "out"), 2)
+
+    def test_pages_render_while_walking(self):
+        # A page is written before the walk hashes the next one.
+        dest = os.path.join(self.root, "out")
+        seen = []
+
+        def hash_and_look(path):
+            seen.append(len(os.listdir(os.path.join(dest, "blog"))) if seen else 0)
+            return hash_file(path)
+
+        with mock.patch("src.main.hash_file", hash_and_look):
+            self.build(dest, 1)
+        self.assertEqual(seen, list(range(6)))
+
+    def test_iter_pages_order(self):
+        # Pages come depth-first in sorted order; other files are skipped.
+        os.makedirs(os.path.join(self.content, "a", "b"))
+        self.write(os.path.join(self.content, "a", "b", "deep.md"), "# Deep")
+        self.write(os.path.join(self.content, "a", "notes.txt"), "skip")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        pages = list(iter_pages(self.content, "docs"))
+        relative = [(os.path.relpath(source, self.content), dest) for source, dest in pages]
+        self.assertEqual(relative[0], (os.path.join("a", "b", "deep.md"), "docs/a/b/deep.html"))
+        self.assertEqual(relative[1], (os.path.join("blog", "post0.md"), "docs/blog/post0.html"))
+        self.assertEqual(relative[-1], ("index.md", "docs/index.html"))
+        self.assertEqual(len(pages), 8)
+
+    def test_iter_pages_is_lazy(self):
+        # A directory is read only when the walk reaches it.
+        os.makedirs(os.path.join(self.content, "later"))
+        pages = iter_pages(self.content, "docs")
+        next(pages)
+        self.write(os.path.join(self.content, "later", "new.md"), "# New")
+        self.assertEqual(
+            list(pages)[-1],
+            (os.path.join(self.content, "later", "new.md"), "docs/later/new.html"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
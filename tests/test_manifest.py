@@ -0,0 +1,62 @@
+import os
+import unittest
+
+from src.manifest import Manifest, hash_bytes, hash_file
+from tests.helpers import SiteTestCase
+
+
+class TestManifest(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest_path = os.path.join(self.root, ".build", "manifest.json")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nHello")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nWorld")
+
+    def build(self):
+        manifest = Manifest.load(self.manifest_path)
+        result = self.build_site(manifest=manifest)
+        manifest.save()
+        return result
+
+    def test_hash_file_matches_hash_bytes(self):
+        # hash_file hashes the raw file contents.
+        self.assertEqual(hash_file(self.template), hash_bytes(b"<title>{{ Title }}</title>{{ Content }}"))
+
+    def test_load_missing_manifest_is_empty(self):
+        # A missing manifest loads as an empty one.
+        self.assertEqual(Manifest.load(self.manifest_path).pages, {})
+
+    def test_second_build_skips_everything(self):
+        # Unchanged inputs are skipped on the next build.
+        self.assertEqual(self.build(), (2, 0, 0))
+        self.assertEqual(self.build(), (0, 2, 0))
+
+    def test_changed_source_rebuilds_only_that_page(self):
+        # Editing one source only re-renders that page.
+        self.build()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        self.assertEqual(self.build(), (1, 1, 0))
+        self.assertIn("Changed", self.read(os.path.join(self.dest, "index.html")))
+
+    def test_changed_template_rebuilds_all(self):
+        # A template change invalidates every page.
+        self.build()
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(self.build(), (2, 0, 0))
+
+    def test_missing_output_is_rebuilt(self):
+        # A deleted output is regenerated even if its source is unchanged.
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html"))
+        self.assertEqual(self.build(), (1, 1, 0))
+
+    def test_removed_source_deletes_output(self):
+        # Outputs whose source disappeared are removed with their empty dirs.
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.assertEqual(self.build(), (0, 1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,14 @@
+import io
 import unittest
 
-from src.markdown_blocks import markdown_to_blocks, BlockType, block_to_block_type
+from src.markdown_blocks import (
+    Block,
+    markdown_to_blocks,
+    BlockType,
+    block_to_block_type,
+    iter_blocks,
+    scan_blocks,
+)
 
 
 class TestMarkdownBlocks(unittest.TestCase):
@@ -93,6 +101,47 @@ This is the same paragraph on a new line
         block = "1. one\n3. three"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_iter_blocks_types_and_line_spans(self):
+        md = "# Title\n## Sub\n\n  para one\npara two\n\n\n- a\n- b\n"
+        blocks = list(iter_blocks(md.split("\n")))
+        self.assertEqual(
+            [(b.text, b.block_type, b.start_line, b.end_line) for b in blocks],
+            [
+                ("# Title", BlockType.HEADING, 0, 1),
+                ("## Sub", BlockType.HEADING, 1, 2),
+                ("para one\npara two", BlockType.PARAGRAPH, 3, 5),
+                ("- a\n- b", BlockType.UNORDERED_LIST, 7, 9),
+            ],
+        )
+        self.assertEqual(blocks, list(scan_blocks(md)))
+
+    def test_scan_blocks_offsets_into_source(self):
+        md = "intro\n\n  > one\n> two  \n"
+        (first, second) = scan_blocks(md)
+        self.assertIs(second.source, md)
+        self.assertEqual((second.start, second.end), (9, 20))
+        self.assertEqual(
+            [md[start:end] for start, end in second.iter_lines()], ["> one", "> two"]
+        )
+        self.assertEqual(second.block_type, BlockType.QUOTE)
+
+    def test_block_from_text(self):
+        block = Block.from_text("1. one\n2. two")
+        self.assertEqual(block.block_type, BlockType.ORDERED_LIST)
+        self.assertEqual(list(block.iter_lines()), [(0, 6), (7, 13)])
+
+    def test_iter_blocks_reads_file_lines(self):
+        md = "```\ncode\n```\n\n> quote\n"
+        blocks = list(iter_blocks(io.StringIO(md)))
+        self.assertEqual([block.text for block in blocks], markdown_to_blocks(md))
+        self.assertEqual(
+            [block.block_type for block in blocks], [BlockType.CODE, BlockType.QUOTE]
+        )
+
+    def test_markdown_to_blocks_drops_whitespace_only_blocks(self):
+        md = "First\n\n   \n\nSecond\n\n\n"
+        self.assertEqual(markdown_to_blocks(md), ["First", "Second"])
+
 
 if __name__ == "__main__":
     unittest.main()
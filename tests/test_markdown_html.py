@@ -1,6 +1,86 @@
+import io
+import os
+import random
 import unittest
 
-from src.markdown_html import markdown_to_html_node
+from bench.corpus import FEATURES, generate_markdown, parse_mix
+from src.markdown_blocks import scan_blocks
+from src.markdown_html import (
+    block_record_to_html_node,
+    block_to_html,
+    iter_markdown_html,
+    markdown_to_html_node,
+)
+from src.urls import UrlResolver
+
+CONTENT_DIR = os.path.join(os.path.dirname(__file__), "..", "content")
+
+# Inputs of the tests above plus edge cases, including ones both renderers
+# reject.
+DIFFERENTIAL_INPUTS = (
+    "This is **bolded** paragraph\ntext in a p\ntag here\n\n"
+    "This is another paragraph with _italic_ text and `code` here\n",
+    "```\nThis is text that _should_ remain\nthe **same** even with inline stuff\n```",
+    "# Heading 1\n\n## Heading 2\n\n###### Heading 6",
+    "- Item A\n- Item **B**\n- Item `C`",
+    "1. First\n2. Second _item_\n3. Third",
+    "> This is a quote\n> with **two** lines",
+    "# Title\n\nParagraph line one\nline two\n\n- Item A\n- Item B",
+    "[a link](/blog/) and ![an image](/images/a.png?v=1#top) and [out](https://x.org)",
+    "```\n<b>raw</b>\n```\n\n```python\n```",
+    "-  x\n\n- \n\n# \n\n1. ",
+    "> ",
+    "``````",
+    "Unclosed **bold",
+    "\n\n",
+    "a\u00a0b  c\t\td",
+)
+
+
+class TestDirectRenderer(unittest.TestCase):
+    def assert_same_output(self, markdown, resolve_url=None):
+        try:
+            expected = markdown_to_html_node(markdown, resolve_url=resolve_url).to_html()
+        except ValueError as error:
+            with self.assertRaises(ValueError) as raised:
+                "".join(iter_markdown_html(io.StringIO(markdown), resolve_url=resolve_url))
+            self.assertEqual(str(raised.exception), str(error))
+            return
+        streamed = "".join(iter_markdown_html(io.StringIO(markdown), resolve_url=resolve_url))
+        self.assertEqual(streamed, expected)
+
+    def test_matches_tree_on_test_inputs(self):
+        # Direct rendering matches the tree's HTML and errors on hand-written inputs.
+        resolvers = (None, UrlResolver("/site/", {"/images/a.png": "/images/a.1234.png"}))
+        for markdown in DIFFERENTIAL_INPUTS:
+            for resolve_url in resolvers:
+                with self.subTest(markdown=markdown, resolver=resolve_url is not None):
+                    self.assert_same_output(markdown, resolve_url)
+
+    def test_matches_tree_on_content(self):
+        # Direct rendering matches the tree's HTML on the site's own pages.
+        for directory, _, names in os.walk(CONTENT_DIR):
+            for name in sorted(names):
+                if name.endswith(".md"):
+                    with open(os.path.join(directory, name)) as file:
+                        markdown = file.read()
+                    with self.subTest(page=name):
+                        self.assert_same_output(markdown, UrlResolver("/Python-SSG/"))
+
+    def test_matches_tree_on_synthetic_corpus(self):
+        # Direct rendering matches the tree's HTML on generated pages of every mix.
+        mixes = [None] + [f"{feature}=6" for feature in FEATURES]
+        for seed, mix in enumerate(mixes):
+            markdown = generate_markdown(random.Random(seed), 80, parse_mix(mix))
+            with self.subTest(mix=mix):
+                self.assert_same_output(markdown)
+                self.assert_same_output(markdown, UrlResolver("/b/"))
+
+    def test_block_to_html_matches_block_node(self):
+        # Each block renders to the same HTML as its node.
+        markdown = generate_markdown(random.Random(7), 40, parse_mix(None))
+        for block in scan_blocks(markdown):
+            self.assertEqual(block_to_html(block), block_record_to_html_node(block).to_html())
 
 
 class TestMarkdownHtml(unittest.TestCase):
@@ -119,6 +199,15 @@ line two
             "<div><p>Line one line two</p></div>",
         )
 
+    def test_iter_markdown_html_matches_tree(self):
+        md = "# Title\n\nSome **bold** text\n\n1. one\n2. two\n\n> quoted _text_\n"
+        streamed = "".join(iter_markdown_html(io.StringIO(md)))
+        self.assertEqual(streamed, markdown_to_html_node(md).to_html())
+
+    def test_iter_markdown_html_empty_document(self):
+        with self.assertRaises(ValueError):
+            list(iter_markdown_html(io.StringIO("\n\n")))
+
 
 if __name__ == "__main__":
     unittest.main()
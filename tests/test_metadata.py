@@ -0,0 +1,81 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src.main import generate_site
+from src.manifest import Manifest
+from src.metadata import index_metadata, listing, read_metadata
+from tests.helpers import SiteTestCase
+
+
+class TestMetadata(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = os.path.join(self.content, "blog", "first.md")
+        self.second = os.path.join(self.content, "blog", "second.md")
+        self.write(self.first, "---\ntitle: First\ndate: 2024-01-05\ntags: [elves]\n---\nBody\n")
+        self.write(self.second, "---\ndate: 2024-02-01\ntags: [dwarves]\n---\n# Second\n")
+        self.pages = [
+            (self.first, os.path.join(self.dest, "blog", "first.html")),
+            (self.second, os.path.join(self.dest, "blog", "second.html")),
+        ]
+
+    def index(self, pages=None):
+        with redirect_stdout(StringIO()):
+            return index_metadata(self.pages if pages is None else pages, self.manifest)
+
+    def test_read_metadata(self):
+        # Front matter is read, with the first h1 as the fallback title.
+        entry, changed = read_metadata(self.second)
+        self.assertTrue(changed)
+        self.assertEqual(
+            entry["meta"], {"title": "Second", "date": "2024-02-01", "tags": ["dwarves"]}
+        )
+
+    def test_reuses_unchanged_entries(self):
+        # Entries are re-read only for changed files.
+        self.assertEqual(self.index(), (2, 0, 0))
+        self.assertEqual(self.index(), (0, 2, 0))
+        self.write(self.first, "---\ntitle: Edited\n---\nLonger body now\n")
+        self.assertEqual(self.index(), (1, 1, 0))
+        self.assertEqual(self.manifest.metadata[self.pages[0][1]]["meta"]["title"], "Edited")
+
+    def test_removes_deleted_pages(self):
+        # Pages that no longer exist leave the index.
+        self.index()
+        self.assertEqual(self.index(self.pages[:1]), (0, 1, 1))
+        self.assertEqual(list(self.manifest.metadata), [self.pages[0][1]])
+
+    def test_persists_in_manifest(self):
+        # The index is saved with the build manifest.
+        self.index()
+        self.manifest.save()
+        self.assertEqual(Manifest.load(self.manifest.path).metadata, self.manifest.metadata)
+
+    def test_listing(self):
+        # Listings are newest first and can be filtered by tag.
+        self.index()
+        self.assertEqual([page["title"] for page in listing(self.manifest)], ["Second", "First"])
+        elves = listing(self.manifest, "tags", "elves")
+        self.assertEqual([page["title"] for page in elves], ["First"])
+
+    def test_generate_site_indexes_metadata(self):
+        # A build indexes every page and does not render front matter.
+        self.build_site()
+        self.assertEqual(len(self.manifest.metadata), 2)
+        self.assertEqual(self.read(self.pages[0][1]), "<title>First</title><div><p>Body</p></div>")
+
+    def test_bad_front_matter_fails_only_its_page(self):
+        # An unclosed header is reported as a page error; the rest build.
+        self.write(self.second, "---\ntitle: Second\n# Second\n")
+        with redirect_stdout(StringIO()) as output:
+            with self.assertRaisesRegex(RuntimeError, "1 page\\(s\\) failed"):
+                generate_site(self.content, self.template, self.dest, "/", self.manifest)
+        self.assertIn("Error generating " + self.pages[1][1], output.getvalue())
+        self.assertTrue(os.path.isfile(self.pages[0][1]))
+        self.assertFalse(os.path.exists(self.pages[1][1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src.dirs import make_parent_dirs
+from src.manifest import hash_bytes
+from src.output import OutputFile, write_changed_paths, write_if_changed
+from tests.helpers import SiteTestCase
+
+
+class TestOutput(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "out", "page.html")
+
+    def test_output_file_skips_identical_content(self):
+        # Identical output leaves the file and its mtime alone.
+        with OutputFile(self.path) as output:
+            output.writelines(["<p>", "hi", "</p>"])
+        self.assertTrue(output.changed)
+        os.utime(self.path, ns=(0, 0))
+        with OutputFile(self.path) as output:
+            output.write("<p>hi</p>")
+        self.assertFalse(output.changed)
+        self.assertEqual(output.hash, hash_bytes(b"<p>hi</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+    def test_output_file_keeps_old_content_on_error(self):
+        # A failed render leaves the previous file and no temporary file.
+        write_if_changed(self.path, b"old")
+        with self.assertRaises(ValueError):
+            with OutputFile(self.path) as output:
+                output.write("half")
+                raise ValueError("render failed")
+        self.assertEqual(self.read_bytes(self.path), b"old")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+    def test_created_directories_are_remembered(self):
+        # A directory is created once and recreated if it was removed since.
+        make_parent_dirs(self.path)
+        self.assertTrue(os.path.isdir(os.path.dirname(self.path)))
+        os.rmdir(os.path.dirname(self.path))
+        self.assertEqual(write_if_changed(self.path, b"page")[0], True)
+        self.assertEqual(self.read_bytes(self.path), b"page")
+
+    def test_write_if_changed_trusts_known_hash(self):
+        # A matching manifest hash skips the write without reading the file.
+        self.assertEqual(write_if_changed(self.path, b"a"), (True, hash_bytes(b"a")))
+        self.assertFalse(write_if_changed(self.path, b"b", hash_bytes(b"b"))[0])
+        self.assertEqual(self.read_bytes(self.path), b"a")
+        self.assertTrue(write_if_changed(self.path, b"b", hash_bytes(b"a"))[0])
+        self.assertEqual(self.read_bytes(self.path), b"b")
+
+    def test_changed_paths_are_relative_and_sorted(self):
+        # The changed-paths list holds one output-relative path per line.
+        list_path = os.path.join(self.root, ".build", "changed.txt")
+        changed = [os.path.join(self.root, "b.html"), os.path.join(self.root, "a", "c.css")]
+        with redirect_stdout(StringIO()):
+            write_changed_paths(list_path, changed + changed[:1], self.root)
+        self.assertEqual(self.read_bytes(list_path), b"a/c.css\nb.html\n")
+
+    def test_rebuild_with_same_output_writes_nothing(self):
+        # Pages re-rendered to identical HTML are not rewritten or listed.
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nHello")
+        changed = []
+        self.build_site(changed=changed)
+        self.assertEqual(changed, [os.path.join(self.dest, "index.html")])
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nHello\n\n")
+        changed = []
+        self.assertEqual(self.build_site(changed=changed), (1, 0, 0))
+        self.assertEqual(changed, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src.block_cache import BlockCache
+from src.manifest import Manifest
+from src.pipeline import run_pipeline
+from tests.helpers import SiteTestCase
+
+
+class TestPipeline(SiteTestCase):
+    template_text = '<a href="/">{{ Title }}</a>{{ Content }}'
+
+    def setUp(self):
+        super().setUp()
+        for i in range(20):
+            self.write(
+                os.path.join(self.content, "blog", f"post{i}.md"),
+                f"# Post {i}\n\nSee [home](/) and **bold** text {i}\n\n- one\n- two",
+            )
+
+    def build(self, dest, jobs=1, io_workers=None, cache=None):
+        manifest = Manifest(os.path.join(self.root, f"{os.path.basename(dest)}.json"))
+        return self.build_site(
+            dest, "/base/", manifest, jobs=jobs, cache=cache, io_workers=io_workers
+        )
+
+    def test_pipeline_matches_serial_build(self):
+        # The async pipeline writes the same files as the synchronous build.
+        serial = os.path.join(self.root, "serial")
+        piped = os.path.join(self.root, "piped")
+        self.assertEqual(self.build(serial), (20, 0, 0))
+        self.assertEqual(self.build(piped, io_workers=3), (20, 0, 0))
+        self.assertEqual(self.read_tree(serial), self.read_tree(piped))
+
+    def test_pipeline_with_processes_and_cache(self):
+        # Worker processes and the block cache work behind the pipeline.
+        serial = os.path.join(self.root, "serial")
+        piped = os.path.join(self.root, "piped")
+        cache = BlockCache(os.path.join(self.root, "blocks.sqlite"))
+        self.build(serial)
+        self.assertEqual(self.build(piped, jobs=2, io_workers=2, cache=cache), (20, 0, 0))
+        cache.close()
+        self.assertEqual(self.read_tree(serial), self.read_tree(piped))
+
+    def test_pipeline_reports_errors_per_page(self):
+        # A page that fails to read or render is reported, others are written.
+        self.write(os.path.join(self.content, "broken.md"), "no title here")
+        dest = os.path.join(self.root, "out")
+        work = [
+            (os.path.join(self.content, *source), os.path.join(dest, name), None, None)
+            for source, name in (
+                (("broken.md",), "broken.html"),
+                (("missing.md",), "missing.html"),
+                (("blog", "post1.md"), "post1.html"),
+            )
+        ]
+        with redirect_stdout(StringIO()):
+            results = run_pipeline(work, self.template, "/", io_workers=2)
+        errors = {os.path.basename(dest): error for _, dest, error, _ in results}
+        self.assertIsInstance(errors["broken.html"], Exception)
+        self.assertIsInstance(errors["missing.html"], FileNotFoundError)
+        self.assertIsNone(errors["post1.html"])
+        self.assertEqual(os.listdir(dest), ["post1.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
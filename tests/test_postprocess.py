@@ -0,0 +1,90 @@
+import gzip
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src.manifest import Manifest
+from src.postprocess import forget_minified_pages, minify_html, postprocess_site
+from tests.helpers import TempDirTestCase
+
+
+class TestMinify(unittest.TestCase):
+    def test_collapses_whitespace_between_blocks(self):
+        # Whitespace next to block tags is dropped, runs elsewhere collapse.
+        html = "<html>\n  <body>\n    <p>Hello\n   <b>big</b>   world</p>\n  </body>\n</html>\n"
+        self.assertEqual(
+            minify_html(html), "<html><body><p>Hello <b>big</b> world</p></body></html>"
+        )
+
+    def test_keeps_preformatted_content(self):
+        # pre, code, script and style content is left byte for byte.
+        html = "<div>\n<pre><code>a  =  1\n\n  b</code></pre>\n<p>x <code> y  z </code> w</p></div>"
+        self.assertEqual(
+            minify_html(html),
+            "<div><pre><code>a  =  1\n\n  b</code></pre><p>x <code> y  z </code> w</p></div>",
+        )
+
+    def test_drops_comments_and_keeps_nbsp(self):
+        # Comments go, but a non-breaking space is content.
+        html = "<p>a <!-- note --> b\u00a0\u00a0c</p><!--[if IE]>x<![endif]-->"
+        self.assertEqual(minify_html(html), "<p>a b\u00a0\u00a0c</p><!--[if IE]>x<![endif]-->")
+
+    def test_keeps_quoted_attributes_whole(self):
+        # A ">" inside a quoted attribute does not end the tag.
+        html = '<p title="a > b">x</p>\n<p data-x=\'1 >  2\'> y </p>'
+        self.assertEqual(minify_html(html), '<p title="a > b">x</p><p data-x=\'1 >  2\'>y</p>')
+
+    def test_minify_is_idempotent(self):
+        # Minifying twice gives the same bytes, so skipped files stay skipped.
+        html = "<ul>\n  <li> one </li>\n  <li>two <i>2</i> </li>\n</ul>"
+        self.assertEqual(minify_html(minify_html(html)), minify_html(html))
+
+
+class TestPostprocess(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = os.path.join(self.root, "index.html")
+        self.style = os.path.join(self.root, "index.css")
+        self.write(self.page, "<html>\n  <body>\n    <p>Hi</p>\n  </body>\n</html>\n")
+        self.write(self.style, "body { color: red; }\n")
+        self.manifest = Manifest(
+            os.path.join(self.root, "manifest.json"),
+            pages={self.page: {}},
+            static={self.style: {}},
+        )
+
+    def run_stage(self, minify, compress):
+        with redirect_stdout(StringIO()):
+            return postprocess_site(self.manifest, minify, compress)
+
+    def test_writes_compressed_siblings(self):
+        # Pages are minified and every output gets a matching .gz sibling.
+        self.assertEqual(self.run_stage(True, True), (2, 0, 0))
+        page = self.read_bytes(self.page)
+        self.assertEqual(page, b"<html><body><p>Hi</p></body></html>")
+        with gzip.open(f"{self.page}.gz") as file:
+            self.assertEqual(file.read(), page)
+        self.assertTrue(os.path.isfile(f"{self.style}.gz"))
+
+    def test_skips_unchanged_outputs(self):
+        # A second run with the same options touches nothing.
+        self.run_stage(True, True)
+        mtime = os.stat(f"{self.page}.gz").st_mtime_ns
+        self.assertEqual(self.run_stage(True, True), (0, 2, 0))
+        self.assertEqual(os.stat(f"{self.page}.gz").st_mtime_ns, mtime)
+        self.write(self.style, "body { color: blue; }\n")
+        self.assertEqual(self.run_stage(True, True), (1, 1, 0))
+
+    def test_disabling_removes_siblings_and_rebuilds_pages(self):
+        # Turning the stage off removes siblings and un-minifies pages.
+        self.run_stage(True, True)
+        forget_minified_pages(self.manifest, False)
+        self.assertNotIn(self.page, self.manifest.pages)
+        self.assertEqual(self.run_stage(False, False), (0, 0, 2))
+        self.assertFalse(os.path.exists(f"{self.page}.gz"))
+        self.assertFalse(os.path.exists(f"{self.style}.gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
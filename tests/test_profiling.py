@@ -0,0 +1,76 @@
+import io
+import json
+import os
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from src import profiling
+from src.markdown_html import iter_markdown_html
+from tests.helpers import TempDirTestCase
+
+
+class TestProfiling(TempDirTestCase):
+    def test_disabled_profiling_is_passthrough(self):
+        # Without an active page, instrumentation returns its inputs untouched.
+        lines = ["a"]
+        stream = io.StringIO()
+        self.assertIs(profiling.timed_iter("read", lines), lines)
+        self.assertIs(profiling.timed_stream(stream), stream)
+        with profiling.stage("tree"):
+            pass
+
+    def test_page_profile_records_stages(self):
+        # A profiled render records time per stage and peak memory.
+        profiling.start_page("page.md")
+        html = "".join(iter_markdown_html(io.StringIO("# T\n\nSome **bold** text\n")))
+        record = profiling.finish_page()
+        self.assertEqual(html, "<div><h1>T</h1><p>Some <b>bold</b> text</p></div>")
+        self.assertEqual(record["source"], "page.md")
+        for name in ("read", "split", "classify", "inline", "serialize"):
+            self.assertGreater(record["stages"][name], 0, name)
+        # Blocks are rendered straight to HTML, so no tree is built.
+        self.assertEqual(record["stages"]["tree"], 0)
+        self.assertAlmostEqual(sum(record["stages"].values()), record["wall"], places=6)
+        self.assertGreater(record["peak_memory"], 0)
+        self.assertIsNone(profiling._current)
+
+    def test_nested_stages_are_exclusive(self):
+        # Time inside a nested stage is not charged to its parent.
+        profile = profiling.PageProfile("x")
+        profile.mark = 0.0
+        with mock.patch("time.perf_counter", side_effect=[1.0, 3.0, 7.0, 8.0]):
+            profile.enter("tree")
+            profile.enter("inline")
+            profile.exit()
+            profile.exit()
+        self.assertEqual(profile.stack, ["other"])
+        self.assertEqual(profile.stages["inline"], 4.0)
+        self.assertEqual(profile.stages["tree"], 3.0)
+        self.assertEqual(profile.stages["other"], 1.0)
+
+    def test_finish_page_stops_its_tracing(self):
+        # Memory tracing started for a page does not outlive it.
+        profiling.start_page("page.md")
+        self.assertTrue(tracemalloc.is_tracing())
+        profiling.finish_page()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_write_trace_and_summary(self):
+        # The trace is Chrome trace-event JSON and the summary lists pages.
+        profiling.start_page("page.md")
+        record = profiling.finish_page()
+        path = os.path.join(self.root, "trace.json")
+        profiling.write_trace(path, [record])
+        trace = json.loads(self.read(path))
+        self.assertEqual(trace["traceEvents"][0]["name"], "page.md")
+        self.assertEqual(trace["traceEvents"][0]["ph"], "X")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            profiling.print_summary([record], top=5)
+        self.assertIn("page.md", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src import search
+from src.block_cache import BlockCache
+from src.markdown_html import markdown_to_html_node
+from src.postprocess import postprocess_site
+from src.search import (
+    SEARCH_DIR,
+    SearchIndex,
+    count_terms,
+    page_url,
+    remove_search_output,
+    search_outputs,
+)
+from tests.helpers import SiteTestCase
+
+
+class TestSearch(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome **home**")
+        self.write(
+            os.path.join(self.content, "blog", "post.md"), "# Post\n\n```\nprint(home)\n```"
+        )
+        self.index = SearchIndex(os.path.join(self.root, "search.json"))
+
+    def tearDown(self):
+        search._current = None
+
+    def read_json(self, *parts):
+        return json.loads(self.read(os.path.join(self.dest, SEARCH_DIR, *parts)))
+
+    def build(self, cache=None):
+        self.build_site(basepath="/site/", cache=cache, search_index=self.index)
+        with redirect_stdout(StringIO()):
+            return self.index.write(self.dest)
+
+    def render_terms(self, markdown, cache=None):
+        search.start_page()
+        markdown_to_html_node(markdown, cache)
+        return search.finish_page()["terms"]
+
+    def test_count_terms(self):
+        # Terms are lowercased words of at least the minimum length.
+        self.assertEqual(count_terms("A Cat, a cat and CATS!"), {"cat": 2, "and": 1, "cats": 1})
+
+    def test_page_url(self):
+        # Index pages map to their directory URL.
+        self.assertEqual(page_url("docs/index.html", "docs", "/b/"), "/b/")
+        self.assertEqual(page_url("docs/blog/index.html", "docs", "/b/"), "/b/blog/")
+        self.assertEqual(page_url("docs/blog/post.html", "docs", "/b/"), "/b/blog/post.html")
+
+    def test_collects_rendered_text(self):
+        # Text nodes and code blocks are collected without markup.
+        terms = self.render_terms("Some **bold** [link](/a)\n\n```\nx = value\n```")
+        self.assertEqual(terms, {"some": 1, "bold": 1, "link": 1, "value": 1})
+
+    def test_not_collecting_by_default(self):
+        # Rendering outside an indexed page collects nothing.
+        markdown_to_html_node("Some text")
+        self.assertFalse(search.is_collecting())
+
+    def test_cached_blocks_keep_their_text(self):
+        # A cache hit collects the same terms as a fresh render.
+        cache = BlockCache(os.path.join(self.root, "blocks.sqlite"))
+        markdown = "# Title\n\nSome *text* here"
+        first = self.render_terms(markdown, cache)
+        second = self.render_terms(markdown, cache)
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 2})
+        cache.close()
+
+    def test_block_without_text_is_a_miss(self):
+        # Blocks cached before indexing was on are rendered again.
+        cache = BlockCache(os.path.join(self.root, "blocks.sqlite"))
+        markdown_to_html_node("Some text", cache)
+        self.assertEqual(self.render_terms("Some text", cache), {"some": 1, "text": 1})
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 2})
+        cache.close()
+
+    def test_writes_prefix_shards(self):
+        # Postings are split into shards by term prefix.
+        self.build()
+        index = self.read_json("index.json")
+        self.assertEqual(
+            sorted(index["docs"].values()),
+            [["/site/", "Home"], ["/site/blog/post.html", "Post"]],
+        )
+        self.assertIn("ho", index["shards"])
+        home = self.read_json("ho.json")["home"]
+        docs = {index["docs"][str(doc)][1]: count for doc, count in zip(home[::2], home[1::2])}
+        self.assertEqual(docs, {"Home": 2, "Post": 1})
+        self.assertTrue(os.path.isfile(os.path.join(self.dest, SEARCH_DIR, "search.js")))
+
+    def test_unchanged_build_writes_nothing(self):
+        # A rebuild with unchanged pages rewrites no index file.
+        self.build()
+        self.index.save()
+        self.index = SearchIndex.load(self.index.path)
+        self.assertEqual(self.build(), [])
+
+    def test_edit_rewrites_affected_shards(self):
+        # Only shards whose terms changed are rewritten, plus the shard list.
+        self.build()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome **zebra**")
+        written = {os.path.basename(path) for path in self.build()}
+        self.assertEqual(written, {"ho.json", "ze.json", "index.json"})
+
+    def test_removed_page_leaves_index(self):
+        # Deleted pages and shards left without terms are removed.
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.build()
+        index = self.read_json("index.json")
+        self.assertEqual(list(index["docs"].values()), [["/site/", "Home"]])
+        self.assertNotIn("pr", index["shards"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, SEARCH_DIR, "pr.json")))
+
+    def test_fresh_page_missing_from_index_is_rendered(self):
+        # Turning the index on renders pages the manifest considers fresh.
+        self.build_site(basepath="/site/")
+        self.build()
+        self.assertEqual(len(self.read_json("index.json")["docs"]), 2)
+
+    def test_page_edited_without_index_is_recounted(self):
+        # An edit built without the index is picked up when it is back on.
+        self.build()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nGreetings **zebra**")
+        self.build_site(basepath="/site/")
+        self.build()
+        index = self.read_json("index.json")
+        docs = {str(doc) for doc, url in index["docs"].items() if url[1] == "Home"}
+        self.assertIn("ze", index["shards"])
+        self.assertEqual({str(doc) for doc in self.read_json("ze.json")["zebra"][::2]}, docs)
+        self.assertNotIn("we", index["shards"])
+
+    def test_outputs_are_compressed(self):
+        # The client and index files get compressed siblings.
+        self.build()
+        outputs = search_outputs(self.dest)
+        self.assertIn(os.path.join(self.dest, SEARCH_DIR, "search.js"), outputs)
+        with redirect_stdout(StringIO()):
+            postprocess_site(self.manifest, compress=True, generated=outputs)
+        for path in outputs:
+            self.assertTrue(os.path.isfile(f"{path}.gz"))
+
+    def test_disabled_index_is_removed(self):
+        # Turning the index off removes its output directory.
+        self.build()
+        changed = []
+        remove_search_output(self.dest, changed)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, SEARCH_DIR)))
+        self.assertIn(os.path.join(self.dest, SEARCH_DIR, "index.json"), changed)
+        self.assertEqual(search_outputs(self.dest), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import unittest
+
+from src.server import LIVERELOAD_SCRIPT, DevSite, page_url
+from tests.helpers import TempDirTestCase
+
+# Source mtimes, in nanoseconds, before and after an edit.
+FIRST = 1_000_000_000
+LATER = 2_000_000_000
+
+
+class TestServer(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "<body>{{ Title }}|{{ Content }}</body>", mtime=FIRST)
+        self.write(os.path.join(self.content, "index.md"), "# Home", mtime=FIRST)
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog", mtime=FIRST)
+        self.write(os.path.join(self.static, "index.css"), "body {}", mtime=FIRST)
+        self.site = DevSite(self.content, self.static, self.template)
+        self.site.refresh()
+
+    def test_page_url(self):
+        # Content paths map to output URLs.
+        source = os.path.join(self.content, "blog", "index.md")
+        self.assertEqual(page_url(source, self.content), "/blog/index.html")
+
+    def test_lookup_pages_and_static(self):
+        # Pages are served from memory with live reload; static files from disk.
+        body, content_type = self.site.lookup("/blog/")
+        self.assertEqual(content_type, "text/html; charset=utf-8")
+        self.assertIn(b"Blog|<div><h1>Blog</h1></div>", body)
+        self.assertIn(LIVERELOAD_SCRIPT.encode(), body)
+        self.assertEqual(self.site.lookup("/blog")[0], body)
+        self.assertEqual(self.site.lookup("/index.css")[0], b"body {}")
+        self.assertEqual(self.site.lookup("/../template.html"), (None, None))
+
+    def test_refresh_rebuilds_only_changed_pages(self):
+        # Only edited pages are re-rendered, and the change version advances.
+        version = self.site.version
+        self.assertEqual(self.site.refresh(), ([], [], False))
+        self.write(os.path.join(self.content, "index.md"), "# Home again", mtime=LATER)
+        self.assertEqual(self.site.refresh(), (["/index.html"], [], False))
+        self.assertIn(b"Home again", self.site.lookup("/")[0])
+        self.assertEqual(self.site.wait_for_change(version, 0), version + 1)
+
+    def test_template_change_rebuilds_everything(self):
+        self.write(self.template, "<main>{{ Content }}</main>", mtime=LATER)
+        rebuilt, _, _ = self.site.refresh()
+        self.assertEqual(sorted(rebuilt), ["/blog/index.html", "/index.html"])
+
+    def test_removed_and_static_changes(self):
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        self.write(os.path.join(self.static, "index.css"), "p {}", mtime=LATER)
+        self.assertEqual(self.site.refresh(), ([], ["/blog/index.html"], True))
+        self.assertEqual(self.site.lookup("/blog/"), (None, None))
+
+    def test_render_errors_are_served(self):
+        self.write(os.path.join(self.content, "index.md"), "no title", mtime=LATER)
+        self.site.refresh()
+        self.assertIn(b"Error rendering", self.site.lookup("/")[0])
+
+    def test_render_errors_are_escaped(self):
+        # Markup in an error message is shown as text, not run.
+        source = os.path.join(self.content, "index.md")
+        self.write(source, "---\n<script>\n---\n# Home", mtime=LATER)
+        self.site.refresh()
+        body = self.site.lookup("/")[0]
+        self.assertIn(b"&lt;script&gt;", body)
+        # The only script left is the live reload one.
+        self.assertEqual(body.count(b"<script>"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import shutil
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from src.main import main
+from src.manifest import Manifest
+from src.shard import (
+    assign_shards,
+    load_partial_manifest,
+    merge_shards,
+    parse_shard,
+    save_partial_manifest,
+    shard_directory,
+)
+from tests.helpers import SiteTestCase
+
+
+class TestShard(SiteTestCase):
+    template_text = '<a href="/">{{ Title }}</a>{{ Content }}'
+
+    def setUp(self):
+        super().setUp()
+        self.shards = os.path.join(self.root, "shards")
+        for i in range(9):
+            self.write(
+                os.path.join(self.content, "blog", f"post{i}.md"),
+                f"# Post {i}\n\n" + "Some **bold** text. " * (i + 1),
+            )
+
+    def build_shard(self, index, count):
+        shard_dir = shard_directory(self.shards, index)
+        manifest = load_partial_manifest(shard_dir)
+        result = self.build_site(
+            os.path.join(shard_dir, "site"), "/base/", manifest, shard=(index, count)
+        )
+        save_partial_manifest(manifest, shard_dir, index, count, "/base/", "hash")
+        return result
+
+    def merge(self, indexes, dest):
+        manifest = Manifest(os.path.join(self.root, "manifest.json"))
+        shard_dirs = [shard_directory(self.shards, index) for index in indexes]
+        with redirect_stdout(StringIO()):
+            return merge_shards(shard_dirs, dest, manifest)
+
+    def test_parse_shard(self):
+        # Shards are numbered 1..N.
+        self.assertEqual(parse_shard("2/3"), (2, 3))
+        for text in ("0/3", "4/3", "1", "a/b"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_shard(text)
+
+    def test_assignment_is_stable_and_balanced(self):
+        # Every page lands in exactly one shard, independent of input order.
+        pages = [
+            (os.path.join(self.content, "blog", f"post{i}.md"), f"post{i}.html")
+            for i in range(9)
+        ]
+        shards = assign_shards(pages, 3)
+        self.assertEqual(shards, assign_shards(list(reversed(pages)), 3))
+        self.assertEqual(sorted(page for shard in shards for page in shard), sorted(pages))
+        loads = [sum(os.path.getsize(source) for source, _ in shard) for shard in shards]
+        self.assertLess(max(loads) - min(loads), os.path.getsize(pages[-1][0]))
+
+    def test_merged_shards_match_full_build(self):
+        # Merging every shard reproduces the single-process build.
+        full = os.path.join(self.root, "full")
+        self.build_site(full, "/base/", Manifest("unused"))
+        built = [self.build_shard(index, 3)[0] for index in (1, 2, 3)]
+        self.assertEqual(sum(built), 9)
+        merged = os.path.join(self.root, "merged")
+        self.assertEqual(self.merge([3, 1, 2], merged), (9, 0))
+        self.assertEqual(self.read_tree(full), self.read_tree(merged))
+        self.assertEqual(self.build_shard(2, 3), (0, built[1], 0))
+
+    def test_merge_after_output_is_removed(self):
+        # Directories remembered from an earlier merge are created again.
+        self.build_shard(1, 1)
+        merged = os.path.join(self.root, "merged")
+        self.merge([1], merged)
+        shutil.rmtree(merged)
+        self.assertEqual(self.merge([1], merged), (9, 0))
+        self.assertEqual(len(self.read_tree(merged)), 9)
+
+    def test_merge_rejects_missing_shards(self):
+        # A merge without every shard fails instead of publishing a partial site.
+        for index in (1, 2):
+            self.build_shard(index, 3)
+        with self.assertRaises(ValueError):
+            self.merge([1, 2], os.path.join(self.root, "merged"))
+
+    def test_merge_rejects_conflicts(self):
+        # Two shards claiming the same output path is an error.
+        for index in (1, 2):
+            self.build_shard(index, 2)
+        first = os.path.join(shard_directory(self.shards, 1), "manifest.json")
+        second = os.path.join(shard_directory(self.shards, 2), "manifest.json")
+        with open(first) as file:
+            taken = next(iter(json.load(file)["pages"]))
+        with open(second) as file:
+            data = json.load(file)
+        data["pages"][taken] = {}
+        with open(second, "w") as file:
+            json.dump(data, file)
+        with self.assertRaises(ValueError):
+            self.merge([1, 2], os.path.join(self.root, "merged"))
+
+    def test_merge_without_minify_restores_pages(self):
+        # Turning minification off between merges puts back the shards' pages.
+        self.write(self.template, "<html>\n  <body>{{ Content }}</body>\n</html>\n")
+        os.makedirs(os.path.join(self.root, "static"))
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        self.addCleanup(os.chdir, cwd)
+        shard_dir = shard_directory("shards", 1)
+        with redirect_stdout(StringIO()):
+            main(["--shard", "1/1", "--shard-dir", "shards", "--no-block-cache"])
+            main(["merge", "--minify", shard_dir])
+            minified = self.read(os.path.join("docs", "blog", "post0.html"))
+            main(["merge", shard_dir])
+        built = self.read(os.path.join(shard_dir, "site", "blog", "post0.html"))
+        self.assertNotEqual(minified, built)
+        self.assertEqual(self.read(os.path.join("docs", "blog", "post0.html")), built)
+
+    def test_shard_reuses_static_fingerprints(self):
+        # Unchanged static files are hashed once across shard builds.
+        self.write(os.path.join(self.root, "static", "index.css"), "body {}")
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        self.addCleanup(os.chdir, cwd)
+        argv = ["--shard", "1/2", "--shard-dir", "shards", "--fingerprint", "--no-block-cache"]
+        with redirect_stdout(StringIO()):
+            main(argv)
+            with mock.patch("src.assets.hash_file") as hash_file:
+                main(argv)
+        hash_file.assert_not_called()
+        manifest = load_partial_manifest(shard_directory("shards", 1))
+        sources = [entry["source"] for entry in manifest.static.values()]
+        self.assertEqual(sources, [os.path.join("./static", "index.css")])
+
+    def test_failed_shard_build_saves_its_manifest(self):
+        # Pages built before a failure are kept in the shard's manifest.
+        self.write(os.path.join(self.content, "broken.md"), "no title here")
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        self.addCleanup(os.chdir, cwd)
+        with redirect_stdout(StringIO()), self.assertRaises(RuntimeError):
+            main(["--shard", "1/1", "--shard-dir", "shards", "--no-block-cache"])
+        manifest = load_partial_manifest(shard_directory("shards", 1))
+        self.assertEqual(len(manifest.pages), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src.manifest import Manifest
+from src.static_sync import sync_directory
+from tests.helpers import TempDirTestCase
+
+
+class TestStaticSync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.manifest = Manifest(os.path.join(self.root, "manifest.json"))
+        self.write(os.path.join(self.source, "index.css"), "body {}")
+        self.write(os.path.join(self.source, "images", "a.png"), "png")
+
+    def sync(self, **kwargs):
+        with redirect_stdout(StringIO()):
+            return sync_directory(self.source, self.dest, self.manifest, **kwargs)
+
+    def test_first_sync_copies_everything(self):
+        # Every file is copied into a fresh destination.
+        self.assertEqual(self.sync(), (2, 0, 0))
+        self.assertEqual(self.read(os.path.join(self.dest, "images", "a.png")), "png")
+
+    def test_unchanged_files_are_skipped(self):
+        # Files with matching size and mtime are not copied again.
+        self.sync()
+        self.assertEqual(self.sync(), (0, 2, 0))
+
+    def test_changed_file_is_copied(self):
+        # A changed source file is copied again.
+        self.sync()
+        path = os.path.join(self.source, "index.css")
+        self.write(path, "body { color: red }")
+        self.assertEqual(self.sync(), (1, 1, 0))
+
+    def test_hash_skips_touched_file(self):
+        # With use_hash, a touched but identical file is not copied.
+        self.sync()
+        path = os.path.join(self.source, "index.css")
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+        self.assertEqual(self.sync(use_hash=True), (0, 2, 0))
+        self.assertEqual(self.sync(), (0, 2, 0))
+
+    def test_orphans_are_removed(self):
+        # Files removed from the source are removed from the destination.
+        self.sync()
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        self.assertEqual(self.sync(), (0, 1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_untracked_files_are_kept(self):
+        # Files the sync never created, such as rendered pages, are left alone.
+        self.sync()
+        page = os.path.join(self.dest, "index.html")
+        self.write(page, "<html></html>")
+        self.sync()
+        self.assertTrue(os.path.exists(page))
+
+    def test_hardlink_mode(self):
+        # Hardlink mode links the destination to the source file.
+        self.sync(link_mode="hardlink")
+        source = os.stat(os.path.join(self.source, "index.css"))
+        dest = os.stat(os.path.join(self.dest, "index.css"))
+        self.assertEqual(source.st_ino, dest.st_ino)
+
+    def test_reflink_mode_falls_back_to_copy(self):
+        # Reflink mode still produces a copy where clones are unsupported.
+        self.assertEqual(self.sync(link_mode="reflink"), (2, 0, 0))
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body {}")
+
+    def test_unknown_link_mode(self):
+        with self.assertRaises(ValueError):
+            self.sync(link_mode="symlink")
+
+
+if __name__ == "__main__":
+    unittest.main()
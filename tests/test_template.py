@@ -0,0 +1,67 @@
+import os
+import unittest
+
+from src.template import compile_template, load_template
+from src.urls import UrlResolver
+from tests.helpers import TempDirTestCase
+
+
+class TestTemplate(TempDirTestCase):
+    def write_template(self, name, text, mtime=None):
+        return self.write(os.path.join(self.root, name), text, mtime)
+
+    def test_compile_segments(self):
+        # Literal text, slots and root-relative URLs become separate segments.
+        path = self.write_template("t.html", '<a href="/x">{{ Title }}</a>')
+        template = compile_template(path)
+        self.assertEqual(
+            template.segments,
+            ["<a ", ("url", "href", "/x"), '">', ("slot", "Title", "{{ Title }}"), "</a>"],
+        )
+
+    def test_render_resolves_root_urls(self):
+        # Root-relative href/src URLs in the template go through the resolver.
+        source = '<link href="/index.css" /><title>{{ Title }}</title><img src="/a.png">{{ Content }}'
+        path = self.write_template("t.html", source)
+        expected = (
+            source.replace("{{ Title }}", "T")
+            .replace('href="/', 'href="/base/')
+            .replace('src="/', 'src="/base/')
+            .replace("{{ Content }}", '<a href="/x">C</a>')
+        )
+        values = {"Title": "T", "Content": '<a href="/x">C</a>'}
+        rendered = load_template(path).render(values, UrlResolver("/base/"))
+        self.assertEqual(rendered, expected)
+
+    def test_unknown_slot_is_left_alone(self):
+        # Slots without a value render as their original text.
+        path = self.write_template("t.html", "{{ Missing }}")
+        self.assertEqual(load_template(path).render({}), "{{ Missing }}")
+
+    def test_include_partial(self):
+        # Partials are inlined and their slots are filled.
+        self.write_template("head.html", "<title>{{ Title }}</title>")
+        path = self.write_template("t.html", '{{ include "head.html" }}<body>{{ Content }}</body>')
+        rendered = load_template(path).render({"Title": "T", "Content": "C"})
+        self.assertEqual(rendered, "<title>T</title><body>C</body>")
+
+    def test_cached_until_partial_changes(self):
+        # Templates are cached by path and recompiled when a partial's mtime changes.
+        self.write_template("head.html", "old", mtime=1_000_000_000)
+        path = self.write_template("t.html", '{{ include "head.html" }}')
+        first = load_template(path)
+        self.assertIs(load_template(path), first)
+        self.write_template("head.html", "new", mtime=2_000_000_000)
+        second = load_template(path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.render({}), "new")
+
+    def test_include_cycle(self):
+        # Self-including templates are rejected.
+        path = self.write_template("t.html", '{{ include "t.html" }}')
+        with self.assertRaises(ValueError):
+            compile_template(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from src.markdown_html import markdown_to_html_node
+from src.urls import UrlResolver
+
+
+class TestUrls(unittest.TestCase):
+    def test_resolver_prefixes_root_relative_urls(self):
+        # Only root-relative URLs get the basepath.
+        resolve_url = UrlResolver("/Python-SSG/")
+        self.assertEqual(resolve_url("/images/a.png"), "/Python-SSG/images/a.png")
+        self.assertEqual(resolve_url("/"), "/Python-SSG/")
+        self.assertEqual(resolve_url("https://example.com/"), "https://example.com/")
+        self.assertEqual(resolve_url("//cdn.example.com/x.js"), "//cdn.example.com/x.js")
+        self.assertEqual(resolve_url("page.html"), "page.html")
+
+    def test_links_and_images_resolved_while_rendering(self):
+        # Link and image props are resolved as the nodes are built.
+        md = "[home](/) ![pic](/images/a.png)"
+        html = markdown_to_html_node(md, resolve_url=UrlResolver("/base/")).to_html()
+        self.assertEqual(
+            html,
+            '<div><p><a href="/base/">home</a> <img src="/base/images/a.png" alt="pic"></img></p></div>',
+        )
+
+    def test_code_blocks_are_not_rewritten(self):
+        # Literal href="/ text inside code is left untouched.
+        md = '```\n<a href="/x">\n```\n\nUse `src="/y"` here'
+        html = markdown_to_html_node(md, resolve_url=UrlResolver("/base/")).to_html()
+        self.assertIn('<code><a href="/x">\n</code>', html)
+        self.assertIn('<code>src="/y"</code>', html)
+
+    def test_block_key_names_only_referenced_assets(self):
+        # A block's key changes only with the assets its targets name.
+        before = UrlResolver("/b/", {"/a.png": "/a.1.png", "/index.css": "/index.1.css"})
+        after = UrlResolver("/b/", {"/a.png": "/a.1.png", "/index.css": "/index.2.css"})
+        self.assertEqual(before.block_key("No links"), "/b/")
+        self.assertEqual(before.block_key("[x](https://a.png)"), "/b/")
+        self.assertEqual(before.block_key("![a](/a.png?v=1)"), after.block_key("![a](/a.png?v=1)"))
+        self.assertNotEqual(before.block_key("![a](/a.png)"), before.block_key("![a](/b.png)"))
+        self.assertNotEqual(before.block_key("[css](/index.css)"), after.block_key("[css](/index.css)"))
+
+
+if __name__ == "__main__":
+    unittest.main()